@@ -3,13 +3,49 @@ BodyVision - Sistema de Análise de Poses de Fisiculturismo
 Arquivo principal do programa
 """
 import cv2
+import os
 import time
+import queue
+import threading
 import numpy as np
+from dataclasses import dataclass
 from pose_evaluator import PoseDetector
-from camera_utils import find_camera
+from camera_utils import (find_camera, fourcc_to_str, get_backend_name, enable_raw_mjpeg,
+                          FrameGrabber, put_latest)
+from ui_helpers import capture_overlay, blend_overlay, split_overlay, clear_gradient_cache
 from ui_renderer import (render_feedback_panel, render_info_panel, render_instructions_panel, 
                          render_pose_skeleton, render_sidebar_menu)
 
+# Índices (no MediaPipe Pose) dos pontos lidos por _evaluate_pose:
+# ombros, cotovelos, punhos e quadris, na ordem de PoseDetector.KEYPOINT_NAMES
+EVAL_INDICES = PoseDetector.KEYPOINT_INDICES[:8]
+# Máscaras de pontos exigidos (ver PoseDetector.LANDMARK_BITS)
+REQ_SHOULDERS = PoseDetector.REQ_SHOULDERS
+REQ_HIPS = PoseDetector.REQ_HIPS
+REQ_DOUBLE_BICEPS = PoseDetector.REQ_DOUBLE_BICEPS
+REQ_ARMS = PoseDetector.REQ_ARMS
+REQ_TORSO = PoseDetector.REQ_TORSO
+
+
+@dataclass(frozen=True)
+class FrameLayout:
+    """Geometria da tela (câmera + menu lateral) para um tamanho de janela e de frame"""
+    window_width: int
+    window_height: int
+    sidebar_width: int
+    camera_display_width: int
+    camera_display_height: int
+    new_width: int
+    new_height: int
+    needs_resize: bool
+    interpolation: int
+    camera_x_offset: int
+    camera_y_offset: int
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
 
 class BodyVisionApp:
     """Classe principal da aplicação BodyVision"""
@@ -21,10 +57,26 @@ class BodyVisionApp:
         'most_muscular': 'Most Muscular',
         'enquadramento': 'Enquadramento'
     }
+    # Resolução pedida à câmera: a da janela em tela cheia, para que o frame
+    # chegue perto do tamanho de exibição e o redimensionamento seja pequeno
+    CAPTURE_SIZE = (1920, 1080)
     
-    def __init__(self):
-        """Inicializa a aplicação"""
-        self.detector = PoseDetector()
+    def __init__(self, infer_size=384, gpu_model_path=None):
+        """Inicializa a aplicação (infer_size: maior lado, em px, do frame usado na inferência;
+        gpu_model_path: arquivo .task do PoseLandmarker para usar a GPU)"""
+        # Modelo lite do MediaPipe por padrão (2-3x mais rápido); [M] alterna para o completo.
+        # A inferência roda a cada 2 frames; nos demais reaproveita o último resultado
+        self.detector = PoseDetector(model_complexity=0, stride=2, live=True,
+                                     gpu_model_path=gpu_model_path)
+        # Frames chegam como JPEG bruto e são decodificados na thread de inferência
+        self._raw_mjpeg = False
+        # Troca de modelo pedida pela thread principal, aplicada pela thread de inferência
+        self._pending_model_complexity = None
+        # Desenha também os landmarks do MediaPipe (depuração)
+        self._draw_mp_landmarks = False
+        # Estilos de desenho dos landmarks, criados uma vez e reaproveitados em todo frame
+        self._landmark_spec = self.detector.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+        self._connection_spec = self.detector.mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2)
         self.pose_mode = 'enquadramento'
         self.window_name = 'BodyVision - Detecção de Poses'
         self.cap = None
@@ -34,151 +86,260 @@ class BodyVisionApp:
         self.sidebar_width_ratio = 0.24  # 24% da largura total para o menu
         self.sidebar_width = None
         self.total_width = None
+        # Maior lado (px) do frame entregue ao MediaPipe; a exibição usa o frame
+        # completo. O modelo trabalha internamente em 256x256, então 384 já sobra;
+        # 640 ajuda só quando a pessoa fica muito longe da câmera. Frames menores
+        # nunca são ampliados
+        self._infer_size = infer_size
+        # Peso do frame anterior na suavização (EMA) dos pontos; 0 desativa
+        self._landmark_smoothing = 0.5
+        self._prev_coords = None
+        # Pixels de todos os landmarks (x, y), preenchidos em process_frame e
+        # lidos por _evaluate_pose (como ints do Python, via tolist)
+        self._points_arr = np.zeros((33, 2), dtype=np.int64)
+        # Pipeline captura -> inferência -> UI: filas de uma posição que mantêm
+        # sempre o item mais recente (frames atrasados são descartados). A
+        # fila de frames pertence ao FrameGrabber, criado em run()
+        self._grabber = None
+        self._result_q = queue.Queue(maxsize=1)
+        self._stop_event = threading.Event()
+        # Layout da tela: recalculado só quando janela ou frame mudam de tamanho
+        self._layout_key = None
+        self._layout = None
+        # Em tela cheia o tamanho da janela é estável: só é consultado por alguns
+        # frames após iniciar/alternar (tempo para o gerenciador de janelas aplicar)
+        self._fullscreen = True
+        self._window_poll_frames = 30
+        # Canvas combinado (câmera + menu) reutilizado entre frames
+        self._canvas = None
+        # Destino do resize da câmera para o tamanho de exibição, reutilizado
+        self._display_buf = None
+        # Camadas pré-renderizadas da UI, cada uma invalidada só pelo que a afeta:
+        # instruções (layout), menu lateral (modo e layout) e painéis de
+        # feedback (por texto, enquanto o layout não mudar)
+        self._instructions_layout = None
+        self._instructions_overlay = None
+        self._sidebar_key = None
+        self._sidebar_overlay = None
+        self._sidebar_margin = None
+        self._feedback_overlays = {}
+        self._feedback_layout = None
+        # FPS exibido: média móvel exponencial (peso do frame atual), com o
+        # texto atualizado só a cada N frames para não ficar oscilando
+        self._fps_smoothing = 0.1
+        self._fps_refresh_frames = 10
+
+    def _infer_loop(self):
+        """Thread de inferência: roda o MediaPipe sobre o frame mais recente"""
+        while not self._stop_event.is_set():
+            try:
+                frame = self._grabber.q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is None:
+                break
+            if self._raw_mjpeg:
+                frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+            if self._pending_model_complexity is not None:
+                model_complexity, self._pending_model_complexity = self._pending_model_complexity, None
+                try:
+                    model_complexity = self.detector.set_model_complexity(model_complexity)
+                    print(f"Modelo: {'lite' if model_complexity == 0 else 'completo'}")
+                except Exception as e:
+                    # O modelo anterior só é fechado depois que o novo carrega
+                    print(f"⚠️  Falha ao trocar o modelo ({e}); mantendo o atual")
+            results = self.detect_pose(frame)
+            put_latest(self._result_q, (frame, results))
+
+        put_latest(self._result_q, None)
+
+    def detect_pose(self, frame):
+        """Executa a detecção de pose do MediaPipe sobre um frame BGR"""
+        # Subamostragem temporal: nos frames pulados pelo detector nem chega a
+        # preparar a imagem de inferência
+        if self.detector.reuse_last_results():
+            return self.detector.last_results
+
+        # Reduz o frame para a resolução de inferência mantendo a proporção.
+        # Os landmarks são normalizados (0..1), então continuam válidos para
+        # o frame de exibição sem nenhuma conversão de coordenadas
+        h, w = frame.shape[:2]
+        scale = self._infer_size / max(h, w)
+        if scale < 1.0:
+            infer_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        else:
+            infer_size = None
+        return self.detector.process_bgr(frame, infer_size)
+
+    def _compute_layout(self, window_width, window_height, frame_w, frame_h):
+        """Calcula as dimensões responsivas da área da câmera e do menu lateral"""
+        # Menu lateral: 24% da largura total
+        sidebar_width = max(int(window_width * self.sidebar_width_ratio), 300)  # Mínimo 300px
+        camera_display_width = window_width - sidebar_width
+        camera_display_height = window_height
         
-    def process_frame(self, frame, pose_mode, camera_width):
-        """Processa um frame e retorna o frame anotado e qualidade da pose"""
-        pose_quality = None
-        # MediaPipe espera RGB, mas podemos passar BGR direto em algumas versões
-        # Para garantir compatibilidade, converte apenas uma vez
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.detector.pose.process(image_rgb)
+        # Redimensiona frame da câmera MANTENDO ASPECT RATIO para evitar distorção
+        camera_aspect = frame_w / frame_h if frame_h > 0 else 16/9
+        display_aspect = camera_display_width / camera_display_height if camera_display_height > 0 else 16/9
+        
+        # Calcula dimensões mantendo proporção (sem distorção)
+        if camera_aspect > display_aspect:
+            # Frame é mais largo - ajusta pela largura e corta em cima/baixo se necessário
+            new_width = camera_display_width
+            new_height = int(camera_display_width / camera_aspect)
+        else:
+            # Frame é mais alto - ajusta pela altura e corta nas laterais se necessário
+            new_height = camera_display_height
+            new_width = int(camera_display_height * camera_aspect)
         
-        # Libera referência para ajudar GC
-        del image_rgb
+        # Garante que não exceda os limites
+        new_width = min(new_width, camera_display_width)
+        new_height = min(new_height, camera_display_height)
+        
+        # Usa INTER_AREA para melhor performance em downscaling
+        if new_width < frame_w or new_height < frame_h:
+            interpolation = cv2.INTER_AREA  # Melhor para reduzir tamanho
+        else:
+            interpolation = cv2.INTER_LINEAR  # Melhor para aumentar tamanho
+        
+        # Centraliza frame redimensionado na área da câmera (mantém aspect ratio)
+        camera_x_offset = max(0, (camera_display_width - new_width) // 2)
+        camera_y_offset = max(0, (camera_display_height - new_height) // 2)
+        
+        return FrameLayout(
+            window_width=window_width,
+            window_height=window_height,
+            sidebar_width=sidebar_width,
+            camera_display_width=camera_display_width,
+            camera_display_height=camera_display_height,
+            new_width=new_width,
+            new_height=new_height,
+            needs_resize=(new_width, new_height) != (frame_w, frame_h),
+            interpolation=interpolation,
+            camera_x_offset=camera_x_offset,
+            camera_y_offset=camera_y_offset,
+            x1=camera_x_offset,
+            y1=camera_y_offset,
+            x2=min(camera_x_offset + new_width, camera_display_width),
+            y2=min(camera_y_offset + new_height, window_height),
+        )
+
+    def _get_layout(self, window_width, window_height, frame_w, frame_h):
+        """Retorna o layout em cache, recalculando apenas se algum tamanho mudou"""
+        key = (window_width, window_height, frame_w, frame_h)
+        if key != self._layout_key:
+            self._layout_key = key
+            self._layout = self._compute_layout(*key)
+            # Os gradientes em cache são do tamanho anterior dos painéis
+            clear_gradient_cache()
+        return self._layout
+
+    def process_frame(self, frame, results, pose_mode, camera_width):
+        """Anota o frame com o resultado da detecção e retorna o frame e a qualidade da pose"""
+        pose_quality = None
 
         if results.pose_landmarks:
-            # Desenha landmarks de forma mais leve (sem preenchimento de conexões)
-            self.detector.mp_drawing.draw_landmarks(
-                frame, 
-                results.pose_landmarks, 
-                self.detector.mp_pose.POSE_CONNECTIONS,
-                # Otimizações de desenho para melhor performance
-                landmark_drawing_spec=self.detector.mp_drawing.DrawingSpec(
-                    color=(0, 255, 0), thickness=2, circle_radius=2
-                ),
-                connection_drawing_spec=self.detector.mp_drawing.DrawingSpec(
-                    color=(255, 255, 255), thickness=2
+            # Esqueleto completo do MediaPipe (33 pontos + conexões) só para
+            # depuração; a visualização normal fica com render_pose_skeleton
+            if self._draw_mp_landmarks:
+                self.detector.mp_drawing.draw_landmarks(
+                    frame, 
+                    results.pose_landmarks, 
+                    self.detector.mp_pose.POSE_CONNECTIONS,
+                    landmark_drawing_spec=self._landmark_spec,
+                    connection_drawing_spec=self._connection_spec
                 )
-            )
             landmarks = results.pose_landmarks.landmark
-            h, w, _ = frame.shape
+            h = frame.shape[0]
 
-            # Obtém pontos importantes do corpo (otimizado - evita múltiplos getattr)
-            points = {}
-            
-            # Cache dos enums para evitar getattr repetido
-            landmark_enum = self.detector.mp_pose.PoseLandmark
-            
-            try:
-                points["LEFT_SHOULDER"] = (int(landmarks[landmark_enum.LEFT_SHOULDER.value].x * camera_width), 
-                                          int(landmarks[landmark_enum.LEFT_SHOULDER.value].y * h))
-                points["LEFT_ELBOW"] = (int(landmarks[landmark_enum.LEFT_ELBOW.value].x * camera_width), 
-                                       int(landmarks[landmark_enum.LEFT_ELBOW.value].y * h))
-                points["LEFT_WRIST"] = (int(landmarks[landmark_enum.LEFT_WRIST.value].x * camera_width), 
-                                       int(landmarks[landmark_enum.LEFT_WRIST.value].y * h))
-                points["RIGHT_SHOULDER"] = (int(landmarks[landmark_enum.RIGHT_SHOULDER.value].x * camera_width), 
-                                           int(landmarks[landmark_enum.RIGHT_SHOULDER.value].y * h))
-                points["RIGHT_ELBOW"] = (int(landmarks[landmark_enum.RIGHT_ELBOW.value].x * camera_width), 
-                                        int(landmarks[landmark_enum.RIGHT_ELBOW.value].y * h))
-                points["RIGHT_WRIST"] = (int(landmarks[landmark_enum.RIGHT_WRIST.value].x * camera_width), 
-                                        int(landmarks[landmark_enum.RIGHT_WRIST.value].y * h))
-                points["LEFT_HIP"] = (int(landmarks[landmark_enum.LEFT_HIP.value].x * camera_width), 
-                                     int(landmarks[landmark_enum.LEFT_HIP.value].y * h))
-                points["RIGHT_HIP"] = (int(landmarks[landmark_enum.RIGHT_HIP.value].x * camera_width), 
-                                      int(landmarks[landmark_enum.RIGHT_HIP.value].y * h))
-                points["LEFT_KNEE"] = (int(landmarks[landmark_enum.LEFT_KNEE.value].x * camera_width), 
-                                      int(landmarks[landmark_enum.LEFT_KNEE.value].y * h))
-                points["RIGHT_KNEE"] = (int(landmarks[landmark_enum.RIGHT_KNEE.value].x * camera_width), 
-                                       int(landmarks[landmark_enum.RIGHT_KNEE.value].y * h))
-                points["LEFT_ANKLE"] = (int(landmarks[landmark_enum.LEFT_ANKLE.value].x * camera_width), 
-                                       int(landmarks[landmark_enum.LEFT_ANKLE.value].y * h))
-                points["RIGHT_ANKLE"] = (int(landmarks[landmark_enum.RIGHT_ANKLE.value].x * camera_width), 
-                                        int(landmarks[landmark_enum.RIGHT_ANKLE.value].y * h))
-            except (AttributeError, IndexError, KeyError):
-                pass
-
-            # Calcula ângulos
-            angle_left = self.detector.calculate_angle(
-                points.get("LEFT_SHOULDER", [0, 0]), 
-                points.get("LEFT_ELBOW", [0, 0]), 
-                points.get("LEFT_WRIST", [0, 0])
-            )
-            angle_right = self.detector.calculate_angle(
-                points.get("RIGHT_SHOULDER", [0, 0]), 
-                points.get("RIGHT_ELBOW", [0, 0]), 
-                points.get("RIGHT_WRIST", [0, 0])
-            )
+            # Converte os landmarks para pixels de uma vez: monta um array (33, 3)
+            # com x, y normalizados e a visibilidade, e escala pela área da câmera
+            # numa única operação NumPy. A disponibilidade de cada ponto vem da
+            # máscara de visibilidade, sem try/except no caminho quente
+            raw = np.fromiter((v for lm in landmarks for v in (lm.x, lm.y, lm.visibility)),
+                              dtype=np.float64, count=len(landmarks) * 3).reshape(-1, 3)
+            # Máscara de bits dos pontos visíveis: as avaliações checam os
+            # pontos exigidos com um único AND em vez de buscas no dicionário
+            visible = raw[:, 2] > self.detector.VISIBILITY_THRESHOLD
+            detected_mask = int(self.detector.LANDMARK_BITS[visible].sum())
+            coords = raw[self.detector.KEYPOINT_INDICES, :2]
+            # Suaviza os pontos (em coordenadas normalizadas, independentes
+            # do tamanho da janela) para disfarçar os frames sem inferência
+            if self._prev_coords is not None and self._landmark_smoothing > 0:
+                coords = (self._landmark_smoothing * self._prev_coords
+                          + (1.0 - self._landmark_smoothing) * coords)
+            self._prev_coords = coords
+            pixels = (coords * (camera_width, h)).astype(np.int32)
+            self._points_arr[self.detector.KEYPOINT_INDICES] = pixels
+            points = dict(zip(self.detector.KEYPOINT_NAMES, map(tuple, pixels.tolist())))
 
-            angle_left_knee = 0
-            angle_right_knee = 0
-            if all(key in points for key in ["LEFT_KNEE", "LEFT_HIP", "LEFT_ANKLE"]):
-                angle_left_knee = self.detector.calculate_angle(
-                    points["LEFT_HIP"], points["LEFT_KNEE"], points["LEFT_ANKLE"]
-                )
-            if all(key in points for key in ["RIGHT_KNEE", "RIGHT_HIP", "RIGHT_ANKLE"]):
-                angle_right_knee = self.detector.calculate_angle(
-                    points["RIGHT_HIP"], points["RIGHT_KNEE"], points["RIGHT_ANKLE"]
-                )
+            # Calcula os quatro ângulos (braços e joelhos) num único kernel compilado
+            angles = self.detector.joint_angles(pixels)
+            angle_left, angle_right, angle_left_knee, angle_right_knee = angles.tolist()
 
             # Avalia a pose
-            pose_quality = self._evaluate_pose(pose_mode, points, angle_left, angle_right, 
+            pose_quality = self._evaluate_pose(pose_mode, detected_mask, angle_left, angle_right, 
                                                angle_left_knee, angle_right_knee, camera_width)
 
             # Renderiza esqueleto da pose
             render_pose_skeleton(frame, points, angle_left, angle_right, 
                                angle_left_knee, angle_right_knee, pose_mode)
+        else:
+            self._prev_coords = None
 
         return frame, pose_quality
 
-    def _evaluate_pose(self, pose_mode, points, angle_left, angle_right, 
+    def _evaluate_pose(self, pose_mode, detected_mask, angle_left, angle_right, 
                       angle_left_knee, angle_right_knee, camera_width):
         """Avalia a pose de acordo com o modo selecionado"""
+        # Coordenadas lidas do array pré-alocado (preenchido em process_frame) e
+        # desempacotadas em variáveis locais uma única vez
+        ((ls_x, ls_y), (le_x, le_y), (lw_x, lw_y), (rs_x, rs_y), (re_x, re_y), (rw_x, rw_y),
+         (lh_x, lh_y), (rh_x, rh_y)) = self._points_arr[EVAL_INDICES].tolist()
         if pose_mode == 'double_biceps':
-            if all(key in points for key in ["LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_SHOULDER", "RIGHT_SHOULDER"]):
+            if (detected_mask & REQ_DOUBLE_BICEPS) == REQ_DOUBLE_BICEPS:
                 return self.detector.evaluate_double_biceps(
                     angle_left, angle_right,
-                    points["LEFT_ELBOW"][1], points["RIGHT_ELBOW"][1],
-                    points["LEFT_SHOULDER"][1], points["RIGHT_SHOULDER"][1]
+                    le_y, re_y, ls_y, rs_y
                 )
             return "Nao foi possivel detectar os pontos necessarios"
             
         elif pose_mode == 'back_double_biceps':
-            if all(key in points for key in ["LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_SHOULDER", 
-                                             "RIGHT_SHOULDER", "LEFT_WRIST", "RIGHT_WRIST"]):
+            if (detected_mask & REQ_ARMS) == REQ_ARMS:
                 return self.detector.evaluate_back_double_biceps(
                     angle_left, angle_right,
-                    points["LEFT_ELBOW"][1], points["RIGHT_ELBOW"][1],
-                    points["LEFT_SHOULDER"][1], points["RIGHT_SHOULDER"][1],
-                    points["LEFT_SHOULDER"][0], points["RIGHT_SHOULDER"][0],
-                    points["LEFT_WRIST"][1], points["RIGHT_WRIST"][1]
+                    le_y, re_y, ls_y, rs_y,
+                    ls_x, rs_x, lw_y, rw_y
                 )
             return "Nao foi possivel detectar os pontos necessarios"
             
         elif pose_mode == 'side_chest':
-            if "LEFT_SHOULDER" not in points or "RIGHT_SHOULDER" not in points:
+            if (detected_mask & REQ_SHOULDERS) != REQ_SHOULDERS:
                 return "Nao foi possivel detectar os ombros"
             
             # Determina qual lado está mais visível
-            shoulder_center_x = (points["LEFT_SHOULDER"][0] + points["RIGHT_SHOULDER"][0]) / 2
-            left_distance = abs(points["LEFT_SHOULDER"][0] - shoulder_center_x)
-            right_distance = abs(points["RIGHT_SHOULDER"][0] - shoulder_center_x)
+            shoulder_center_x = (ls_x + rs_x) / 2
+            left_distance = abs(ls_x - shoulder_center_x)
+            right_distance = abs(rs_x - shoulder_center_x)
             
             if left_distance < right_distance:
                 visible_arm_angle = angle_left
-                visible_elbow_height = points.get("LEFT_ELBOW", [0, 0])[1]
-                visible_shoulder_height = points["LEFT_SHOULDER"][1]
-                visible_knee_angle = angle_left_knee if angle_left_knee > 0 else 170
+                visible_elbow_height = le_y
+                visible_shoulder_height = ls_y
+                visible_knee_angle = angle_left_knee if angle_left_knee > 0 else 170.0
                 opposite_arm_angle = angle_right
             else:
                 visible_arm_angle = angle_right
-                visible_elbow_height = points.get("RIGHT_ELBOW", [0, 0])[1]
-                visible_shoulder_height = points["RIGHT_SHOULDER"][1]
-                visible_knee_angle = angle_right_knee if angle_right_knee > 0 else 170
+                visible_elbow_height = re_y
+                visible_shoulder_height = rs_y
+                visible_knee_angle = angle_right_knee if angle_right_knee > 0 else 170.0
                 opposite_arm_angle = angle_left
             
             hip_rotation = 0
-            if "LEFT_HIP" in points and "RIGHT_HIP" in points:
-                hip_rotation = abs(points["LEFT_HIP"][0] - points["RIGHT_HIP"][0])
+            if (detected_mask & REQ_HIPS) == REQ_HIPS:
+                hip_rotation = abs(lh_x - rh_x)
             
             return self.detector.evaluate_side_chest(
                 visible_arm_angle, visible_elbow_height, visible_shoulder_height,
@@ -186,33 +347,27 @@ class BodyVisionApp:
             )
             
         elif pose_mode == 'most_muscular':
-            if all(key in points for key in ["LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_SHOULDER", 
-                                             "RIGHT_SHOULDER", "LEFT_WRIST", "RIGHT_WRIST"]):
-                shoulder_width = abs(points["RIGHT_SHOULDER"][0] - points["LEFT_SHOULDER"][0])
+            if (detected_mask & REQ_ARMS) == REQ_ARMS:
+                shoulder_width = abs(rs_x - ls_x)
                 
                 torso_alignment = 0
-                if all(key in points for key in ["LEFT_SHOULDER", "LEFT_HIP", "RIGHT_SHOULDER", "RIGHT_HIP"]):
-                    torso_alignment = abs((points["LEFT_SHOULDER"][1] - points["LEFT_HIP"][1]) - 
-                                         (points["RIGHT_SHOULDER"][1] - points["RIGHT_HIP"][1]))
+                if (detected_mask & REQ_TORSO) == REQ_TORSO:
+                    torso_alignment = abs((ls_y - lh_y) - (rs_y - rh_y))
                 
                 return self.detector.evaluate_most_muscular(
                     angle_left, angle_right,
-                    points["LEFT_ELBOW"][1], points["RIGHT_ELBOW"][1],
-                    points["LEFT_SHOULDER"][1], points["RIGHT_SHOULDER"][1],
+                    le_y, re_y, ls_y, rs_y,
                     shoulder_width,
-                    angle_left_knee if angle_left_knee > 0 else 175,
-                    angle_right_knee if angle_right_knee > 0 else 175,
+                    angle_left_knee if angle_left_knee > 0 else 175.0,
+                    angle_right_knee if angle_right_knee > 0 else 175.0,
                     torso_alignment,
-                    points["LEFT_WRIST"][0], points["RIGHT_WRIST"][0],
-                    points["LEFT_SHOULDER"][0], points["RIGHT_SHOULDER"][0]
+                    lw_x, rw_x, ls_x, rs_x
                 )
             return "Nao foi possivel detectar os pontos necessarios"
             
         elif pose_mode == 'enquadramento':
-            if "LEFT_SHOULDER" in points and "RIGHT_SHOULDER" in points:
-                return self.detector.evaluate_centered(
-                    points["LEFT_SHOULDER"][0], points["RIGHT_SHOULDER"][0], camera_width
-                )
+            if (detected_mask & REQ_SHOULDERS) == REQ_SHOULDERS:
+                return self.detector.evaluate_centered(ls_x, rs_x, camera_width)
             return "Nao foi possivel detectar os pontos necessarios"
         else:
             return f"Modo '{pose_mode}' ainda nao implementado"
@@ -230,7 +385,10 @@ class BodyVisionApp:
             print("   - Verifique as permissões de câmera nas configurações do sistema")
             return
 
-        # Obtém resolução real da câmera
+        # Pede a resolução de captura e obtém a resolução real da câmera
+        # (pode ser outra se o dispositivo não suportar a pedida)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.CAPTURE_SIZE[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.CAPTURE_SIZE[1])
         actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         
@@ -258,6 +416,18 @@ class BodyVisionApp:
         configured_fps = self.cap.get(cv2.CAP_PROP_FPS)
         print(f"📹 FPS da câmera configurado: {configured_fps:.2f}")
         
+        # Confere se o formato pedido foi aceito (o MJPG pode falhar em silêncio)
+        fourcc = fourcc_to_str(self.cap.get(cv2.CAP_PROP_FOURCC))
+        print(f"📹 Backend: {get_backend_name(self.cap)} | Formato: {fourcc or 'desconhecido'}")
+        if fourcc != 'MJPG':
+            print("⚠️  A câmera não aceitou MJPG; o FPS pode ficar limitado pelo formato descompactado")
+        
+        # Com MJPG no V4L2, recebe o JPEG bruto e decodifica na thread de
+        # inferência, liberando a thread de captura para o próximo frame
+        self._raw_mjpeg = enable_raw_mjpeg(self.cap)
+        if self._raw_mjpeg:
+            print("📹 Decodificação MJPEG movida para a thread de inferência")
+        
         # Define FPS alvo para o loop
         self.target_fps = 30.0
         self.frame_time = 1.0 / self.target_fps
@@ -284,137 +454,168 @@ class BodyVisionApp:
             self.camera_height = 1080
             actual_height = 1080
 
-        prev_time = time.time()
-        frame_error_count = 0
-        max_frame_errors = 10
-        last_frame_time = time.time()
+        window_size = (self.total_width, self.camera_height)
+        prev_time = time.perf_counter()
+        fps_ema = self.target_fps
+        fps_display = fps_ema
+        ui_frame = 0
 
         print("🎬 Iniciando detecção de poses...")
         print("💡 Controles:")
         print("   [Q] - Sair")
         print("   [F] - Alternar tela cheia")
+        print("   [M] - Alternar modelo (lite/completo)")
         print("   [1-5] - Mudar de pose")
 
-        while self.cap.isOpened():
-            loop_start_time = time.time()
-            
-            ret, frame = self.cap.read()
-            if not ret or frame is None:
-                frame_error_count += 1
-                if frame_error_count > max_frame_errors:
-                    print(f"❌ Erro: Falha ao capturar frames consecutivos ({max_frame_errors} vezes)")
-                    print("   Verifique se a câmera ainda está conectada e funcionando")
+        # Captura e inferência rodam em threads próprias; a thread principal
+        # só consome resultados prontos e cuida da UI (OpenCV/MediaPipe liberam o GIL)
+        self._stop_event.clear()
+        self._grabber = FrameGrabber(self.cap, self._stop_event)
+        workers = [
+            self._grabber,
+            threading.Thread(target=self._infer_loop, name="BodyVisionInference", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        while not self._stop_event.is_set():
+            loop_start_time = time.perf_counter()
+
+            try:
+                item = self._result_q.get(timeout=0.1)
+            except queue.Empty:
+                # Mantém a janela responsiva enquanto aguarda o próximo resultado
+                if not self._handle_key(cv2.waitKey(1) & 0xFF):
                     break
-                time.sleep(0.1)
                 continue
+            if item is None:
+                break
+            frame, results = item
 
-            frame_error_count = 0
-
-            # Obtém tamanho atual da janela em tela cheia
-            window_rect = cv2.getWindowImageRect(self.window_name)
-            
-            # Sempre usa o tamanho real da janela (que deve estar em tela cheia)
-            if window_rect[2] > 0 and window_rect[3] > 0:
-                window_width = window_rect[2]
-                window_height = window_rect[3]
-            else:
-                # Se não conseguir detectar, força valores de tela cheia
-                window_width = 1920
-                window_height = 1080
-            
-            # Calcula dimensões responsivas baseadas no tamanho da janela
-            # Menu lateral: 24% da largura total
-            sidebar_width = max(int(window_width * self.sidebar_width_ratio), 300)  # Mínimo 300px
-            camera_display_width = window_width - sidebar_width
-            camera_display_height = window_height
+            # Obtém tamanho atual da janela. Em modo janela o usuário pode
+            # redimensionar a qualquer momento; em tela cheia só após alternar
+            if not self._fullscreen or self._window_poll_frames > 0:
+                self._window_poll_frames = max(0, self._window_poll_frames - 1)
+                window_rect = cv2.getWindowImageRect(self.window_name)
+                if window_rect[2] > 0 and window_rect[3] > 0:
+                    window_size = (window_rect[2], window_rect[3])
+                else:
+                    # Se não conseguir detectar, força valores de tela cheia
+                    window_size = (1920, 1080)
+            window_width, window_height = window_size
             
-            # Redimensiona frame da câmera MANTENDO ASPECT RATIO para evitar distorção
+            # Layout responsivo (em cache enquanto os tamanhos não mudarem)
             frame_h, frame_w = frame.shape[:2]
-            camera_aspect = frame_w / frame_h if frame_h > 0 else 16/9
-            display_aspect = camera_display_width / camera_display_height if camera_display_height > 0 else 16/9
+            layout = self._get_layout(window_width, window_height, frame_w, frame_h)
+            new_width = layout.new_width
             
-            # Calcula dimensões mantendo proporção (sem distorção)
-            if camera_aspect > display_aspect:
-                # Frame é mais largo - ajusta pela largura e corta em cima/baixo se necessário
-                new_width = camera_display_width
-                new_height = int(camera_display_width / camera_aspect)
+            # Redimensiona frame da câmera mantendo aspect ratio (sem distorção).
+            # Se já tem o tamanho de exibição, desenha direto no frame capturado
+            # (cada leitura da câmera devolve um buffer novo)
+            if layout.needs_resize and new_width > 0 and layout.new_height > 0:
+                # Buffer de exibição reutilizado: só é lido até a cópia para o canvas
+                if self._display_buf is None or self._display_buf.shape[:2] != (layout.new_height, new_width):
+                    self._display_buf = np.empty((layout.new_height, new_width, 3), dtype=np.uint8)
+                frame_resized = cv2.resize(frame, (new_width, layout.new_height), dst=self._display_buf,
+                                           interpolation=layout.interpolation)
             else:
-                # Frame é mais alto - ajusta pela altura e corta nas laterais se necessário
-                new_height = camera_display_height
-                new_width = int(camera_display_height * camera_aspect)
-            
-            # Garante que não exceda os limites
-            new_width = min(new_width, camera_display_width)
-            new_height = min(new_height, camera_display_height)
-            
-            # Redimensiona frame da câmera mantendo aspect ratio (sem distorção)
-            # Usa INTER_AREA para melhor performance em downscaling
-            if new_width < frame_w or new_height < frame_h:
-                interpolation = cv2.INTER_AREA  # Melhor para reduzir tamanho
-            else:
-                interpolation = cv2.INTER_LINEAR  # Melhor para aumentar tamanho
-            frame_resized = cv2.resize(frame, (new_width, new_height), interpolation=interpolation)
+                frame_resized = frame
             
             # Processa frame redimensionado e obtém feedback
-            frame_resized, pose_quality = self.process_frame(frame_resized, self.pose_mode, new_width)
+            frame_resized, pose_quality = self.process_frame(frame_resized, results, self.pose_mode, new_width)
 
             # Calcula FPS real
-            curr_time = time.time()
+            curr_time = time.perf_counter()
             elapsed = curr_time - prev_time
             if elapsed > 0:
                 fps = 1.0 / elapsed
             else:
                 fps = self.target_fps
             prev_time = curr_time
+            fps_ema += self._fps_smoothing * (fps - fps_ema)
             
             # Controle de frame rate: só limita se estiver processando MUITO rápido
-            # Não adiciona delay se já estiver lento (abaixo de 30 FPS)
-            processing_time = time.time() - loop_start_time
+            # Não adiciona delay se já estiver lento (abaixo de 30 FPS).
+            # A espera é feita pelo próprio cv2.waitKey no fim do loop, que já
+            # bombeia os eventos da janela (sem time.sleep extra)
+            processing_time = curr_time - loop_start_time
             if processing_time < self.frame_time * 0.8:  # Só limita se processou em menos de 80% do tempo
-                sleep_time = max(0, self.frame_time - processing_time)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                delay_ms = max(1, int((self.frame_time - processing_time) * 1000))
+            else:
+                delay_ms = 1
 
-            # Cria canvas combinado (câmera + menu) com tamanho exato da janela
-            combined_frame = np.zeros((window_height, window_width, 3), dtype=np.uint8)
-            combined_frame.fill(15)  # Fundo escuro preto
-            
-            # Centraliza frame redimensionado na área da câmera (mantém aspect ratio)
-            camera_x_offset = max(0, (camera_display_width - new_width) // 2)
-            camera_y_offset = max(0, (camera_display_height - new_height) // 2)
+            # Canvas combinado (câmera + menu) com tamanho exato da janela:
+            # alocado uma vez e reutilizado enquanto a janela não mudar de tamanho
+            if self._canvas is None or self._canvas.shape[:2] != (window_height, window_width):
+                self._canvas = np.full((window_height, window_width, 3), 15, dtype=np.uint8)  # Fundo escuro
+                self._sidebar_key = None  # canvas novo: o menu precisa ser copiado de novo
+            combined_frame = self._canvas
             
             # Copia frame redimensionado centralizado na área da câmera
-            y1 = camera_y_offset
-            y2 = min(camera_y_offset + new_height, window_height)
-            x1 = camera_x_offset
-            x2 = min(camera_x_offset + new_width, camera_display_width)
-            
-            # Ajusta dimensões se necessário
+            x1, y1, x2, y2 = layout.x1, layout.y1, layout.x2, layout.y2
             frame_h_actual = y2 - y1
             frame_w_actual = x2 - x1
             
-            if frame_h_actual > 0 and frame_w_actual > 0:
-                combined_frame[y1:y2, x1:x2] = frame_resized[:frame_h_actual, :frame_w_actual]
+            # Um único copyMakeBorder (caminho SIMD do OpenCV) copia o frame e
+            # pinta as faixas de letterbox direto na view da área da câmera do
+            # canvas; o menu lateral (fundo opaco) sobrescreve o restante
+            camera_display_width = layout.camera_display_width
+            camera_visible = frame_h_actual > 0 and frame_w_actual > 0
+            if camera_visible:
+                cv2.copyMakeBorder(frame_resized[:frame_h_actual, :frame_w_actual],
+                                   y1, layout.camera_display_height - y2,
+                                   x1, camera_display_width - x2,
+                                   cv2.BORDER_CONSTANT, dst=combined_frame[:, :camera_display_width],
+                                   value=(15, 15, 15))
+            elif camera_display_width > 0:
+                # Janela degenerada (sem área visível para o frame): só o fundo
+                combined_frame[:, :camera_display_width] = 15
             
             # Coordenadas para renderização dos painéis UI (relativas ao frame renderizado)
             
             mode_display = self.MODE_NAMES.get(self.pose_mode, self.pose_mode)
             
-            # Renderiza painéis de UI sobre a área da câmera
-            render_info_panel(combined_frame, mode_display, fps, 
-                            frame_w_actual, frame_h_actual,
-                            x1, y1)
-            render_instructions_panel(combined_frame, frame_w_actual, frame_h_actual,
-                                     x1, y1)
+            # Renderiza o FPS suavizado sobre a área da câmera (valor atualizado a cada N frames)
+            if ui_frame % self._fps_refresh_frames == 0:
+                fps_display = fps_ema
+            ui_frame += 1
+            if camera_visible:
+                render_info_panel(combined_frame, mode_display, fps_display, 
+                                frame_w_actual, frame_h_actual,
+                                x1, y1)
+            
+                # Instruções e menu lateral não mudam entre frames: são renderizados
+                # só quando o layout (ou, no menu, o modo) muda e depois apenas compostos
+                if layout != self._instructions_layout:
+                    self._instructions_layout = layout
+                    self._instructions_overlay = self._render_instructions_overlay(layout)
+                blend_overlay(combined_frame, self._instructions_overlay)
             
-            # Renderiza painel de feedback
-            if pose_quality:
-                render_feedback_panel(combined_frame, pose_quality, frame_w_actual, frame_h_actual,
-                                     x1, y1)
+            # Renderiza painel de feedback (um por texto de feedback, em cache)
+            if camera_visible and pose_quality:
+                if layout != self._feedback_layout:
+                    self._feedback_layout = layout
+                    self._feedback_overlays = {}
+                feedback_overlay = self._feedback_overlays.get(pose_quality)
+                if feedback_overlay is None:
+                    feedback_overlay = capture_overlay(
+                        lambda img: render_feedback_panel(img, pose_quality, frame_w_actual, frame_h_actual,
+                                                          x1, y1),
+                        window_height, camera_display_width)
+                    self._feedback_overlays[pose_quality] = feedback_overlay
+                blend_overlay(combined_frame, feedback_overlay)
             
-            # Renderiza menu lateral na posição correta
-            render_sidebar_menu(combined_frame, self.pose_mode, self.MODE_NAMES, 
-                               camera_display_width, window_height)
+            # Menu lateral (fundo opaco: cópia direta). À direita da área da
+            # câmera nada mais escreve no canvas, então essa faixa só é copiada
+            # quando o modo ou o layout mudam; a cada frame basta recompor a
+            # margem que invade a área da câmera
+            sidebar_key = (self.pose_mode, layout)
+            if sidebar_key != self._sidebar_key:
+                self._sidebar_key = sidebar_key
+                self._sidebar_margin, self._sidebar_overlay = split_overlay(
+                    self._render_sidebar_overlay(layout), camera_display_width)
+                blend_overlay(combined_frame, self._sidebar_overlay)
+            blend_overlay(combined_frame, self._sidebar_margin)
             
             cv2.imshow(self.window_name, combined_frame)
 
@@ -423,46 +624,90 @@ class BodyVisionApp:
                 print("Janela fechada pelo usuário.")
                 break
 
-            # Processa teclas
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q') or key == 27:
-                print("Encerrando programa...")
+            # Processa teclas (e aguarda o restante do tempo do frame)
+            if not self._handle_key(cv2.waitKey(delay_ms) & 0xFF):
                 break
-            elif key == ord('f') or key == ord('F'):
-                # Alterna tela cheia
-                current_prop = cv2.getWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN)
-                if current_prop == cv2.WINDOW_FULLSCREEN:
-                    cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-                    print("Modo janela")
-                else:
-                    cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-                    print("Modo tela cheia")
-            elif key == ord('1'):
-                self.pose_mode = 'enquadramento'
-                print("Modo: Enquadramento")
-            elif key == ord('2'):
-                self.pose_mode = 'double_biceps'
-                print("Modo: Duplo Bíceps (Frente)")
-            elif key == ord('3'):
-                self.pose_mode = 'back_double_biceps'
-                print("Modo: Duplo Bíceps de Costas")
-            elif key == ord('4'):
-                self.pose_mode = 'side_chest'
-                print("Modo: Side Chest")
-            elif key == ord('5'):
-                self.pose_mode = 'most_muscular'
-                print("Modo: Most Muscular")
-
-        # Limpeza
+
+        # Limpeza: encerra as threads antes de liberar a câmera
         print("Liberando recursos...")
+        self._stop_event.set()
+        for worker in workers:
+            worker.join(timeout=1.0)
         if self.cap is not None:
             self.cap.release()
         cv2.destroyAllWindows()
         print("✅ Programa encerrado com sucesso!")
 
+    def _render_instructions_overlay(self, layout):
+        """Pré-renderiza a camada do painel de instruções (só depende do layout)"""
+        x1, y1 = layout.x1, layout.y1
+        frame_w, frame_h = layout.x2 - x1, layout.y2 - y1
+        return capture_overlay(
+            lambda img: render_instructions_panel(img, frame_w, frame_h, x1, y1),
+            layout.window_height, layout.camera_display_width)
+
+    def _render_sidebar_overlay(self, layout):
+        """Pré-renderiza a camada do menu lateral para o modo atual"""
+        # Captura só a faixa do menu, mais 2 px à esquerda: a linha separadora
+        # (3 px de espessura) invade a borda da área da câmera
+        margin = 2
+        sidebar_x = layout.camera_display_width - margin
+        return capture_overlay(
+            lambda img: render_sidebar_menu(img, self.pose_mode, self.MODE_NAMES,
+                                            margin, layout.window_height),
+            layout.window_height, layout.window_width - sidebar_x, origin=(sidebar_x, 0))
+
+    def _handle_key(self, key):
+        """Processa uma tecla pressionada; retorna False quando o programa deve encerrar"""
+        if key == ord('q') or key == 27:
+            print("Encerrando programa...")
+            return False
+        elif key == ord('f') or key == ord('F'):
+            # Alterna tela cheia
+            current_prop = cv2.getWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN)
+            if current_prop == cv2.WINDOW_FULLSCREEN:
+                cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+                self._fullscreen = False
+                print("Modo janela")
+            else:
+                cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+                self._fullscreen = True
+                print("Modo tela cheia")
+            # Tamanho da janela muda: volta a consultá-lo por alguns frames
+            self._window_poll_frames = 30
+        elif key == ord('m') or key == ord('M'):
+            if self.detector.model_complexity is None:
+                # Backend de GPU (MediaPipe Tasks): não há variantes lite/completo
+                print("⚠️  Troca de modelo indisponível com o delegate de GPU")
+            else:
+                # O modelo é recriado pela thread de inferência, entre dois frames
+                self._pending_model_complexity = 1 if self.detector.model_complexity == 0 else 0
+        elif key == ord('1'):
+            self.pose_mode = 'enquadramento'
+            print("Modo: Enquadramento")
+        elif key == ord('2'):
+            self.pose_mode = 'double_biceps'
+            print("Modo: Duplo Bíceps (Frente)")
+        elif key == ord('3'):
+            self.pose_mode = 'back_double_biceps'
+            print("Modo: Duplo Bíceps de Costas")
+        elif key == ord('4'):
+            self.pose_mode = 'side_chest'
+            print("Modo: Side Chest")
+        elif key == ord('5'):
+            self.pose_mode = 'most_muscular'
+            print("Modo: Most Muscular")
+        return True
+
 
 def main():
     """Função principal"""
+    # Garante os caminhos SIMD do OpenCV e usa todos os núcleos nas operações paralelas
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(os.cpu_count() or 4)
+    # Nenhuma operação usa UMat: desliga o OpenCL para evitar a inicialização do runtime
+    cv2.ocl.setUseOpenCL(False)
+    
     app = BodyVisionApp()
     app.run()
 
@@ -3,6 +3,8 @@ Módulo com utilitários para gerenciamento de câmera
 """
 import cv2
 import time
+import queue
+import threading
 
 
 def find_camera():
@@ -33,3 +35,76 @@ def find_camera():
     
     return None, None
 
+
+
+def fourcc_to_str(fourcc):
+    """Converte o código FOURCC numérico (CAP_PROP_FOURCC) em texto, ex.: 'MJPG'"""
+    code = int(fourcc)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+
+
+def get_backend_name(cap):
+    """Retorna o nome do backend de captura (V4L2, MSMF, AVFOUNDATION...)"""
+    try:
+        return cap.getBackendName()
+    except cv2.error:
+        return "desconhecido"
+
+
+def enable_raw_mjpeg(cap):
+    """Tenta receber os frames MJPEG ainda comprimidos; quem lê passa a decodificá-los com cv2.imdecode"""
+    if get_backend_name(cap) != "V4L2" or fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)) != "MJPG":
+        return False
+    if not cap.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+        return False
+    
+    # Sem conversão o V4L2 entrega o JPEG como um buffer de bytes de uma linha;
+    # confirma com um frame real antes de mudar o pipeline
+    ret, data = cap.read()
+    if ret and data is not None and (data.ndim == 1 or data.shape[0] == 1):
+        if cv2.imdecode(data, cv2.IMREAD_COLOR) is not None:
+            return True
+    
+    cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+    return False
+
+
+def put_latest(q, item):
+    """Coloca item na fila de uma posição, descartando o anterior se ainda não foi consumido"""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    q.put_nowait(item)
+
+
+class FrameGrabber(threading.Thread):
+    """Thread de captura: lê frames da câmera e publica sempre o mais recente em `q`"""
+    
+    def __init__(self, cap, stop_event, max_frame_errors=10):
+        super().__init__(name="BodyVisionCapture", daemon=True)
+        self.cap = cap
+        # Fila de uma posição: quem consome recebe sempre o frame mais novo e
+        # os atrasados são descartados (cap.read libera o GIL enquanto espera)
+        self.q = queue.Queue(maxsize=1)
+        self._stop_event = stop_event
+        self._max_frame_errors = max_frame_errors
+    
+    def run(self):
+        frame_error_count = 0
+        while not self._stop_event.is_set() and self.cap.isOpened():
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                frame_error_count += 1
+                if frame_error_count > self._max_frame_errors:
+                    print(f"❌ Erro: Falha ao capturar frames consecutivos ({self._max_frame_errors} vezes)")
+                    print("   Verifique se a câmera ainda está conectada e funcionando")
+                    break
+                time.sleep(0.1)
+                continue
+            
+            frame_error_count = 0
+            put_latest(self.q, frame)
+        
+        # Sinaliza fim da captura para quem consome a fila
+        put_latest(self.q, None)
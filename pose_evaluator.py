@@ -3,108 +3,261 @@ Módulo responsável pela detecção e avaliação de poses de fisiculturismo
 """
 import cv2
 import mediapipe as mp
-import math
+import numpy as np
+import time
+from types import SimpleNamespace
+from mediapipe.framework.formats import landmark_pb2
+
+import pose_kernels
+
+
+def _feedback_table(messages, success):
+    """Monta a mensagem de feedback de cada máscara de erros possível (índice = máscara do kernel)"""
+    table = [success]
+    for mask in range(1, 1 << len(messages)):
+        errors = [msg for bit, msg in enumerate(messages) if mask >> bit & 1]
+        table.append("Posicao incorreta - " + "; ".join(errors) + ".")
+    return tuple(table)
+
+
+class _TasksPoseAdapter:
+    """Adapta o PoseLandmarker do MediaPipe Tasks (delegate de GPU) à interface de mp.solutions.pose.Pose"""
+
+    def __init__(self, model_asset_path, pose_options):
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_asset_path,
+                                              delegate=mp.tasks.BaseOptions.Delegate.GPU),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=pose_options['min_detection_confidence'],
+            min_tracking_confidence=pose_options['min_tracking_confidence'],
+        )
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+        self._timestamp_ms = 0
+
+    def process(self, image_rgb):
+        """Detecta a pose e devolve um resultado no formato de mp.solutions (pose_landmarks.landmark)"""
+        # O modo VIDEO exige timestamps estritamente crescentes
+        self._timestamp_ms = max(self._timestamp_ms + 1, int(time.perf_counter() * 1000))
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+        result = self._landmarker.detect_for_video(image, self._timestamp_ms)
+        
+        pose_landmarks = None
+        if result.pose_landmarks:
+            pose_landmarks = landmark_pb2.NormalizedLandmarkList()
+            for lm in result.pose_landmarks[0]:
+                pose_landmarks.landmark.add(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+        return SimpleNamespace(pose_landmarks=pose_landmarks)
+
+    def close(self):
+        self._landmarker.close()
 
 
 class PoseDetector:
-    def __init__(self, static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    # Pontos do corpo usados na avaliação e seus índices no MediaPipe Pose
+    KEYPOINT_NAMES = (
+        "LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST",
+        "RIGHT_SHOULDER", "RIGHT_ELBOW", "RIGHT_WRIST",
+        "LEFT_HIP", "RIGHT_HIP", "LEFT_KNEE", "RIGHT_KNEE",
+        "LEFT_ANKLE", "RIGHT_ANKLE",
+    )
+    KEYPOINT_INDICES = np.array(
+        [mp.solutions.pose.PoseLandmark[name].value for name in KEYPOINT_NAMES], dtype=np.intp
+    )
+    # Trios (ponto, vértice, ponto) em índices de KEYPOINT_NAMES: braços e joelhos
+    ANGLE_TRIPLES = np.array([
+        [0, 1, 2],   # LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST
+        [3, 4, 5],   # RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST
+        [6, 8, 10],  # LEFT_HIP, LEFT_KNEE, LEFT_ANKLE
+        [7, 9, 11],  # RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE
+    ], dtype=np.intp)
+
+    # Visibilidade mínima (0..1, estimada pelo MediaPipe) para um ponto contar como detectado
+    VISIBILITY_THRESHOLD = 0.5
+    # Bit de cada landmark na máscara de pontos detectados (33 landmarks -> int64)
+    LANDMARK_BITS = np.left_shift(1, np.arange(33, dtype=np.int64))
+    # Máscaras com os pontos exigidos por cada avaliação
+    _LM = mp.solutions.pose.PoseLandmark
+    REQ_SHOULDERS = (1 << _LM.LEFT_SHOULDER) | (1 << _LM.RIGHT_SHOULDER)
+    REQ_HIPS = (1 << _LM.LEFT_HIP) | (1 << _LM.RIGHT_HIP)
+    REQ_DOUBLE_BICEPS = REQ_SHOULDERS | (1 << _LM.LEFT_ELBOW) | (1 << _LM.RIGHT_ELBOW)
+    REQ_ARMS = REQ_DOUBLE_BICEPS | (1 << _LM.LEFT_WRIST) | (1 << _LM.RIGHT_WRIST)
+    REQ_TORSO = REQ_SHOULDERS | REQ_HIPS
+    del _LM
+
+    # Mensagens de erro na ordem dos bits devolvidos por pose_kernels
+    DOUBLE_BICEPS_ERRORS = (
+        "Cotovelo esquerdo muito baixo",
+        "Cotovelo direito muito baixo",
+        "Angulo do braco esquerdo fora do intervalo (30-80 graus)",
+        "Angulo do braco direito fora do intervalo (30-80 graus)",
+    )
+    BACK_DOUBLE_BICEPS_ERRORS = (
+        "Cotovelo esquerdo muito baixo - eleve acima do ombro",
+        "Cotovelo direito muito baixo - eleve acima do ombro",
+        "Angulo do braco esquerdo incorreto (30-80 graus)",
+        "Angulo do braco direito incorreto (30-80 graus)",
+    )
+    SIDE_CHEST_ERRORS = (
+        "Braco visivel deve estar contraido (75-90 graus)",
+    )
+    MOST_MUSCULAR_ERRORS = (
+        "Cotovelo esquerdo deve estar abaixo do ombro",
+        "Cotovelo direito deve estar abaixo do ombro",
+        "Bracos devem estar contraidos um contra o outro - aproxime as maos",
+    )
+    # Feedback pronto para cada máscara (até 16 entradas): a avaliação vira
+    # uma indexação de tupla, sem montar listas e strings a cada frame
+    DOUBLE_BICEPS_FEEDBACK = _feedback_table(DOUBLE_BICEPS_ERRORS, "Posicao correta - Excelente postura!")
+    BACK_DOUBLE_BICEPS_FEEDBACK = _feedback_table(BACK_DOUBLE_BICEPS_ERRORS,
+                                                  "Posicao correta - Excelente duplo biceps de costas!")
+    SIDE_CHEST_FEEDBACK = _feedback_table(SIDE_CHEST_ERRORS, "Posicao correta - Excelente side chest!")
+    MOST_MUSCULAR_FEEDBACK = _feedback_table(MOST_MUSCULAR_ERRORS, "Posicao correta - Excelente most muscular!")
+    CENTERED_FEEDBACK = ("Usuario bem centralizado na imagem.",
+                         "Centralize-se melhor na camera para avaliacao precisa.")
+
+    def __init__(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, stride=1,
+                 live=False, gpu_model_path=None):
         """Inicializa os módulos do MediaPipe Pose"""
         self.mp_pose = mp.solutions.pose
-        # Usa model_complexity=1 (modelo já instalado, evita download)
+        if live:
+            # Vídeo ao vivo: rastreia a pose entre frames com limiar mais baixo,
+            # para o detector completo só voltar a rodar quando o rastreamento se perde
+            static_image_mode = False
+            smooth_landmarks = True
+            min_tracking_confidence = 0.3
         # smooth_landmarks=True para suavização (melhor UX)
-        self.pose = self.mp_pose.Pose(
+        self._pose_options = dict(
             static_image_mode=static_image_mode,
-            model_complexity=1,  # 1 = médio (modelo já instalado), evita erro de SSL
-            smooth_landmarks=True,
+            smooth_landmarks=smooth_landmarks,
             enable_segmentation=False,  # Desabilita segmentação para melhor performance
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
+        self.pose = None
+        self.model_complexity = None
+        # Lembra se o modelo lite falhou ao carregar (sem rede para o download),
+        # para não tentar baixá-lo de novo a cada troca de modelo
+        self._lite_unavailable = False
+        # Opcional: PoseLandmarker (MediaPipe Tasks) com delegate de GPU, a partir
+        # de um arquivo .task; se a GPU não estiver disponível segue na CPU
+        if gpu_model_path is not None:
+            try:
+                self.pose = _TasksPoseAdapter(gpu_model_path, self._pose_options)
+                print("🚀 MediaPipe Pose rodando com delegate de GPU")
+            except Exception as e:
+                print(f"⚠️  Delegate de GPU indisponível ({e}); usando a CPU")
+        if self.pose is None:
+            self.set_model_complexity(model_complexity)
+        # Subamostragem temporal: a pose muda pouco entre frames consecutivos,
+        # então o MediaPipe só roda a cada `stride` frames
+        self.stride = max(1, stride)
+        self._frame_idx = 0
+        self.last_results = None
+        # Buffer RGB de inferência reutilizado entre frames (alocado no primeiro)
+        self._rgb_buf = None
         self.mp_drawing = mp.solutions.drawing_utils
+        # Compila os kernels de avaliação agora para não travar o primeiro frame
+        pose_kernels.warmup()
 
-    @staticmethod
-    def calculate_angle(a: list[float], b: list[float], c: list[float]) -> float:
-        """Calcula o ângulo formado entre três pontos (por exemplo: ombro, cotovelo e pulso)"""
-        ba = [a[0] - b[0], a[1] - b[1]]
-        bc = [c[0] - b[0], c[1] - b[1]]
-        dot_product = ba[0] * bc[0] + ba[1] * bc[1]
-        magnitude_ba = math.sqrt(ba[0]**2 + ba[1]**2)
-        magnitude_bc = math.sqrt(bc[0]**2 + bc[1]**2)
-        if magnitude_ba == 0 or magnitude_bc == 0:
-            return 0
+    def set_model_complexity(self, model_complexity):
+        """(Re)cria o modelo do MediaPipe Pose: 0 = lite (mais rápido), 1 = completo"""
+        if model_complexity == 0 and self._lite_unavailable:
+            model_complexity = 1
+        if self.pose is not None and model_complexity == self.model_complexity:
+            return model_complexity
+        try:
+            pose = self.mp_pose.Pose(model_complexity=model_complexity, **self._pose_options)
+        except Exception as e:
+            # O modelo lite é baixado na primeira execução; sem rede (ou com erro
+            # de SSL) usa o modelo completo, que já vem instalado com o MediaPipe
+            if model_complexity == 1:
+                raise
+            self._lite_unavailable = True
+            print(f"⚠️  Não foi possível carregar o modelo (complexidade {model_complexity}): {e}")
+            print("   Usando o modelo completo (complexidade 1)")
+            return self.set_model_complexity(1)
         
-        # Normaliza o valor para evitar erro de domínio em math.acos
-        cos_angle = dot_product / (magnitude_ba * magnitude_bc)
-        cos_angle = max(-1.0, min(1.0, cos_angle))  # Limita entre -1 e 1
-        
-        angle_radians = math.acos(cos_angle)
-        return math.degrees(angle_radians)
+        if self.pose is not None:
+            self.pose.close()
+        self.pose = pose
+        self.model_complexity = model_complexity
+        return model_complexity
+
+    def reuse_last_results(self):
+        """Conta um frame e diz se ele pode reaproveitar last_results em vez de rodar o modelo"""
+        frame_idx = self._frame_idx
+        self._frame_idx += 1
+        # Sem pessoa no último resultado roda de novo já no frame seguinte,
+        # para não atrasar a detecção de quem acabou de entrar no quadro
+        return (frame_idx % self.stride != 0 and self.last_results is not None
+                and self.last_results.pose_landmarks is not None)
+
+    def process(self, image_rgb):
+        """Roda o MediaPipe Pose sobre uma imagem RGB e guarda o resultado em last_results"""
+        self.last_results = self.pose.process(image_rgb)
+        return self.last_results
+
+    def process_bgr(self, frame, size=None):
+        """Converte um frame BGR (reduzido para size=(w, h), se informado) para RGB e roda o MediaPipe Pose"""
+        # MediaPipe espera RGB contíguo (uma view com canais invertidos seria
+        # copiada internamente): redimensiona direto para o buffer pré-alocado
+        # e converte para RGB no próprio buffer, sem alocar nada por frame.
+        # INTER_NEAREST basta: a cópia só alimenta o detector
+        h, w = frame.shape[:2]
+        infer_w, infer_h = size or (w, h)
+        if self._rgb_buf is None or self._rgb_buf.shape[:2] != (infer_h, infer_w):
+            self._rgb_buf = np.empty((infer_h, infer_w, 3), dtype=np.uint8)
+        if (infer_w, infer_h) != (w, h):
+            cv2.resize(frame, (infer_w, infer_h), dst=self._rgb_buf, interpolation=cv2.INTER_NEAREST)
+            cv2.cvtColor(self._rgb_buf, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        # Buffer somente leitura: o MediaPipe referencia os dados em vez de copiá-los
+        self._rgb_buf.flags.writeable = False
+        try:
+            return self.process(self._rgb_buf)
+        finally:
+            self._rgb_buf.flags.writeable = True
+
+    @classmethod
+    def joint_angles(cls, pixels: np.ndarray) -> np.ndarray:
+        """Ângulos dos braços e joelhos (ordem de ANGLE_TRIPLES) a partir dos pixels de KEYPOINT_NAMES, formato (K, 2)"""
+        return pose_kernels.joint_angles(pixels, cls.ANGLE_TRIPLES)
 
     @staticmethod
     def evaluate_double_biceps(left_angle, right_angle, left_elbow_height, right_elbow_height, 
                                left_shoulder_height, right_shoulder_height):
         """Avalia a postura 'duplo bíceps' com base em altura dos cotovelos e ângulo dos braços"""
-        errors = []
-        if left_elbow_height > left_shoulder_height:
-            errors.append("Cotovelo esquerdo muito baixo")
-        if right_elbow_height > right_shoulder_height:
-            errors.append("Cotovelo direito muito baixo")
-        if not 30 <= left_angle <= 80:
-            errors.append("Angulo do braco esquerdo fora do intervalo (30-80 graus)")
-        if not 30 <= right_angle <= 80:
-            errors.append("Angulo do braco direito fora do intervalo (30-80 graus)")
-        if errors:
-            return "Posicao incorreta - " + "; ".join(errors) + "."
-        return "Posicao correta - Excelente postura!"
+        mask = pose_kernels.eval_double_biceps(left_angle, right_angle, left_elbow_height, right_elbow_height,
+                                               left_shoulder_height, right_shoulder_height)
+        return PoseDetector.DOUBLE_BICEPS_FEEDBACK[mask]
 
     @staticmethod
     def evaluate_centered(shoulder_left_x, shoulder_right_x, width):
         """Verifica se o usuário está centralizado horizontalmente na imagem"""
-        center_x = width // 2
-        body_center_x = (shoulder_left_x + shoulder_right_x) // 2
-        offset = abs(center_x - body_center_x)
-        threshold = width * 0.1
-        if offset < threshold:
-            return "Usuario bem centralizado na imagem."
-        else:
-            return "Centralize-se melhor na camera para avaliacao precisa."
+        return PoseDetector.CENTERED_FEEDBACK[pose_kernels.eval_centered(shoulder_left_x, shoulder_right_x, width)]
 
     @staticmethod
     def evaluate_back_double_biceps(left_angle, right_angle, left_elbow_height, right_elbow_height, 
                                      left_shoulder_height, right_shoulder_height, left_shoulder_x, right_shoulder_x,
                                      left_wrist_height, right_wrist_height):
         """Avalia a postura 'duplo bíceps de costas' - cotovelo acima do ombro, ângulo 30-80 graus"""
-        errors = []
-        
-        # Métrica principal: cotovelo acima do ombro
-        if left_elbow_height > left_shoulder_height:
-            errors.append("Cotovelo esquerdo muito baixo - eleve acima do ombro")
-        if right_elbow_height > right_shoulder_height:
-            errors.append("Cotovelo direito muito baixo - eleve acima do ombro")
-        
-        # Métrica principal: braço fazendo ângulo de 30-80 graus
-        if not 30 <= left_angle <= 80:
-            errors.append("Angulo do braco esquerdo incorreto (30-80 graus)")
-        if not 30 <= right_angle <= 80:
-            errors.append("Angulo do braco direito incorreto (30-80 graus)")
-        
-        if errors:
-            return "Posicao incorreta - " + "; ".join(errors) + "."
-        return "Posicao correta - Excelente duplo biceps de costas!"
+        # Mesmas métricas do duplo bíceps de frente (cotovelo acima do ombro e
+        # braço em 30-80 graus), só muda o texto do feedback
+        mask = pose_kernels.eval_double_biceps(left_angle, right_angle, left_elbow_height, right_elbow_height,
+                                               left_shoulder_height, right_shoulder_height)
+        return PoseDetector.BACK_DOUBLE_BICEPS_FEEDBACK[mask]
 
     @staticmethod
     def evaluate_side_chest(visible_arm_angle, visible_elbow_height, visible_shoulder_height, 
                             hip_rotation, visible_knee_angle, opposite_arm_angle):
         """Avalia a postura 'side chest' - corpo de lado, braço visível contraído em 75-90 graus"""
-        errors = []
-        
         # Métrica principal: braço virado para a câmera deve estar contraído em 75-90 graus
-        if not 75 <= visible_arm_angle <= 90:
-            errors.append("Braco visivel deve estar contraido (75-90 graus)")
-        
-        if errors:
-            return "Posicao incorreta - " + "; ".join(errors) + "."
-        return "Posicao correta - Excelente side chest!"
+        mask = pose_kernels.eval_side_chest(visible_arm_angle)
+        return PoseDetector.SIDE_CHEST_FEEDBACK[mask]
 
     @staticmethod
     def evaluate_most_muscular(left_arm_angle, right_arm_angle, left_elbow_height, right_elbow_height,
@@ -112,23 +265,10 @@ class PoseDetector:
                                left_knee_angle, right_knee_angle, torso_alignment,
                                left_wrist_x, right_wrist_x, left_shoulder_x, right_shoulder_x):
         """Avalia a postura 'most muscular' - cotovelos abaixo dos ombros, braços contraídos um contra o outro"""
-        errors = []
-        
-        # Métrica principal: cotovelos devem estar ABAIXO dos ombros
-        if left_elbow_height <= left_shoulder_height + 10:
-            errors.append("Cotovelo esquerdo deve estar abaixo do ombro")
-        if right_elbow_height <= right_shoulder_height + 10:
-            errors.append("Cotovelo direito deve estar abaixo do ombro")
-        
-        # Métrica principal: braços devem estar contraídos um contra o outro
-        wrist_distance = abs(left_wrist_x - right_wrist_x)
-        shoulder_width_actual = abs(right_shoulder_x - left_shoulder_x)
-        
-        # Os punhos devem estar próximos (máximo 50% da largura dos ombros)
-        if shoulder_width_actual > 0 and wrist_distance > shoulder_width_actual * 0.5:
-            errors.append("Bracos devem estar contraidos um contra o outro - aproxime as maos")
-        
-        if errors:
-            return "Posicao incorreta - " + "; ".join(errors) + "."
-        return "Posicao correta - Excelente most muscular!"
-
+        # Métricas principais: cotovelos ABAIXO dos ombros e punhos próximos
+        # (no máximo 50% da largura dos ombros)
+        mask = pose_kernels.eval_most_muscular(left_elbow_height, right_elbow_height,
+                                               left_shoulder_height, right_shoulder_height,
+                                               left_wrist_x, right_wrist_x,
+                                               left_shoulder_x, right_shoulder_x)
+        return PoseDetector.MOST_MUSCULAR_FEEDBACK[mask]
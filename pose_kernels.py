@@ -0,0 +1,105 @@
+"""
+Núcleo numérico das avaliações de pose, compilado com Numba quando disponível
+
+Cada kernel recebe apenas escalares e devolve uma máscara de bits com os erros
+encontrados (bit 0 = primeira verificação, bit 1 = segunda, ...). A tradução
+da máscara para as mensagens de feedback fica em pose_evaluator.py.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba é opcional: sem ele os kernels rodam como Python puro
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Limites das avaliações. Constantes globais são embutidas pelo Numba no
+# código compilado, como se fossem literais
+ARM_ANGLE_MIN, ARM_ANGLE_MAX = 30, 80          # duplo bíceps (frente e costas)
+SIDE_CHEST_ANGLE_MIN, SIDE_CHEST_ANGLE_MAX = 75, 90
+CENTER_TOLERANCE = 0.1                         # fração da largura da imagem
+ELBOW_BELOW_SHOULDER_MARGIN = 10               # px, most muscular
+MAX_WRIST_DISTANCE_RATIO = 0.5                 # fração da largura dos ombros
+
+
+@njit(cache=True)
+def joint_angles(pixels, triples):
+    """Ângulos (em graus) no vértice de cada trio (ponto, vértice, ponto) de índices em `pixels` (K, 2)"""
+    angles = np.empty(triples.shape[0])
+    for i in range(triples.shape[0]):
+        a, b, c = triples[i, 0], triples[i, 1], triples[i, 2]
+        bax = float(pixels[a, 0] - pixels[b, 0])
+        bay = float(pixels[a, 1] - pixels[b, 1])
+        bcx = float(pixels[c, 0] - pixels[b, 0])
+        bcy = float(pixels[c, 1] - pixels[b, 1])
+        # atan2(|ba x bc|, ba . bc) equivale ao acos do cosseno normalizado, mas
+        # dispensa o clip e é estável perto de 0/180 graus; o "+ 0.0" troca -0.0
+        # por 0.0 para vetores nulos darem 0 e não 180 graus
+        dot = bax * bcx + bay * bcy + 0.0
+        angles[i] = math.degrees(abs(math.atan2(bax * bcy - bay * bcx, dot)))
+    return angles
+
+
+@njit(cache=True)
+def eval_double_biceps(left_angle, right_angle, left_elbow_height, right_elbow_height,
+                       left_shoulder_height, right_shoulder_height):
+    """Erros do duplo bíceps: cotovelos abaixo dos ombros e braços fora de 30-80 graus"""
+    mask = 0
+    if left_elbow_height > left_shoulder_height:
+        mask |= 1
+    if right_elbow_height > right_shoulder_height:
+        mask |= 2
+    if not ARM_ANGLE_MIN <= left_angle <= ARM_ANGLE_MAX:
+        mask |= 4
+    if not ARM_ANGLE_MIN <= right_angle <= ARM_ANGLE_MAX:
+        mask |= 8
+    return mask
+
+
+@njit(cache=True)
+def eval_centered(shoulder_left_x, shoulder_right_x, width):
+    """Retorna 1 se o centro dos ombros estiver a mais de 10% da largura do centro da imagem"""
+    center_x = width // 2
+    body_center_x = (shoulder_left_x + shoulder_right_x) // 2
+    if abs(center_x - body_center_x) < width * CENTER_TOLERANCE:
+        return 0
+    return 1
+
+
+@njit(cache=True)
+def eval_side_chest(visible_arm_angle):
+    """Erro do side chest: braço visível fora de 75-90 graus"""
+    if not SIDE_CHEST_ANGLE_MIN <= visible_arm_angle <= SIDE_CHEST_ANGLE_MAX:
+        return 1
+    return 0
+
+
+@njit(cache=True)
+def eval_most_muscular(left_elbow_height, right_elbow_height, left_shoulder_height,
+                       right_shoulder_height, left_wrist_x, right_wrist_x,
+                       left_shoulder_x, right_shoulder_x):
+    """Erros do most muscular: cotovelos acima dos ombros e punhos afastados"""
+    mask = 0
+    if left_elbow_height <= left_shoulder_height + ELBOW_BELOW_SHOULDER_MARGIN:
+        mask |= 1
+    if right_elbow_height <= right_shoulder_height + ELBOW_BELOW_SHOULDER_MARGIN:
+        mask |= 2
+    wrist_distance = abs(left_wrist_x - right_wrist_x)
+    shoulder_width_actual = abs(right_shoulder_x - left_shoulder_x)
+    if shoulder_width_actual > 0 and wrist_distance > shoulder_width_actual * MAX_WRIST_DISTANCE_RATIO:
+        mask |= 4
+    return mask
+
+
+def warmup():
+    """Compila os kernels com os tipos usados no loop (float para ângulos, int para pixels)"""
+    joint_angles(np.zeros((3, 2), dtype=np.int32), np.array([[0, 1, 2]], dtype=np.intp))
+    eval_double_biceps(0.0, 0.0, 0, 0, 0, 0)
+    eval_centered(0, 0, 1)
+    eval_side_chest(0.0)
+    eval_most_muscular(0, 0, 0, 0, 0, 0, 0, 0)
@@ -6,16 +6,30 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import os
-import re
+from functools import lru_cache
 
 # Cache global de fontes
 _font_cache = {}
 _cached_font_path = None
 
+# Caracteres acentuados que exigem renderização via PIL
+_ACCENTS = frozenset('àáâãäèéêëìíîïòóôõöùúûüÀÁÂÃÄÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜçÇ')
+
+# Contexto de desenho reutilizado só para medir texto (textbbox não depende
+# do tamanho da imagem, então basta uma imagem mínima criada uma vez)
+_MEASURE_DRAW = ImageDraw.Draw(Image.new('RGBA', (1, 1), (0, 0, 0, 0)))
+
 
 def _has_accent(text):
     """Verifica se o texto contém caracteres acentuados"""
-    return bool(re.search(r'[àáâãäèéêëìíîïòóôõöùúûüÀÁÂÃÄÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜçÇ]', text))
+    # isascii() é O(1) em str (flag interna) e cobre o caso comum (FPS, ângulos)
+    return not text.isascii() and not _ACCENTS.isdisjoint(text)
+
+
+@lru_cache(maxsize=512)
+def _cv2_text_size(text, font_scale, thickness):
+    """Tamanho (largura, altura) do texto na fonte Hershey do cv2 (em cache)"""
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0]
 
 
 def get_font_path():
@@ -84,27 +98,52 @@ def put_text_utf8(img, text, position, font_scale, color, thickness=2, font_path
         # Usa LINE_AA apenas para texto grande (melhor performance)
         line_type = cv2.LINE_AA if font_scale > 0.6 else cv2.LINE_8
         cv2.putText(img, text, position, font, font_scale, color, thickness, line_type)
-        text_size, _ = cv2.getTextSize(text, font, font_scale, thickness)
-        return text_size[0], text_size[1]
+        return _cv2_text_size(text, font_scale, thickness)
     
     # Renderização com PIL apenas para texto com acentos
     if font_path is None:
         font_path = get_font_path()
     
-    # Usa cache de fonte
+    # Rasterização em cache: textos repetidos (menu, feedback) viram só um blend
     base_font_size = max(10, int(font_scale * 30))
-    font = _get_cached_font(base_font_size, font_path)
+    color_rgb = (color[2], color[1], color[0])  # Converte cor BGR para RGB
+    text_bgr, alpha, inv_alpha, text_width, text_height = _rasterize(text, base_font_size, color_rgb, font_path)
+    max_text_h, max_text_w = alpha.shape
+    
+    x, y = position
+    padding = 3  # Reduzido para melhor performance
+    
+    # Calcula região de interesse na imagem principal
+    roi_y1 = max(0, y - padding)
+    roi_y2 = min(img.shape[0], y + text_height + padding * 2)
+    roi_x1 = max(0, x)
+    roi_x2 = min(img.shape[1], x + text_width + padding * 2)
+    
+    if roi_y2 > roi_y1 and roi_x2 > roi_x1:
+        # Ajusta tamanho do texto renderizado para corresponder ao ROI
+        text_roi_h = min(max_text_h, roi_y2 - roi_y1)
+        text_roi_w = min(max_text_w, roi_x2 - roi_x1)
+        
+        # Um único blend do OpenCV (SIMD) com pesos alpha / 1 - alpha por
+        # pixel, escrito direto na view da imagem
+        roi = img[roi_y1:roi_y1+text_roi_h, roi_x1:roi_x1+text_roi_w]
+        cv2.blendLinear(text_bgr[:text_roi_h, :text_roi_w], roi,
+                        alpha[:text_roi_h, :text_roi_w], inv_alpha[:text_roi_h, :text_roi_w], dst=roi)
+    
+    return text_width, text_height
+
+
+@lru_cache(maxsize=256)
+def _rasterize(text, font_size, color_rgb, font_path):
+    """Rasteriza o texto com PIL e retorna (BGR, alpha, 1 - alpha, largura, altura); os arrays são compartilhados"""
+    font = _get_cached_font(font_size, font_path)
     
-    # Renderiza apenas na região necessária do texto (otimização)
-    # Estima tamanho do texto (usando imagem menor para medição)
-    img_temp = Image.new('RGBA', (1000, 100), (0, 0, 0, 0))
-    draw_temp = ImageDraw.Draw(img_temp)
-    bbox = draw_temp.textbbox((0, 0), text, font=font)
+    # Mede o texto com o contexto de medição compartilhado
+    bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
-    x, y = position
-    padding = 3  # Reduzido para melhor performance
+    padding = 3
     
     # Limita tamanho máximo da imagem de texto para melhor performance
     max_text_w = min(text_width + padding * 2, 800)
@@ -113,98 +152,124 @@ def put_text_utf8(img, text, position, font_scale, color, thickness=2, font_path
     # Cria imagem apenas para o texto com padding
     text_img = Image.new('RGBA', (max_text_w, max_text_h), (0, 0, 0, 0))
     draw = ImageDraw.Draw(text_img)
-    
-    # Converte cor BGR para RGB
-    color_rgb = (color[2], color[1], color[0])
-    
-    # Desenha texto
     draw.text((padding, padding), text, fill=color_rgb, font=font)
     
-    # Converte para numpy (mais rápido)
+    # Converte uma vez para BGR e pesos float do blend
     text_array = np.asarray(text_img, dtype=np.uint8)
+    text_bgr = cv2.cvtColor(text_array, cv2.COLOR_RGBA2BGR)
+    alpha = text_array[:, :, 3].astype(np.float32)
+    alpha *= 1.0 / 255.0
+    inv_alpha = 1.0 - alpha
     
-    # Calcula região de interesse na imagem principal
-    roi_y1 = max(0, y - padding)
-    roi_y2 = min(img.shape[0], y + text_height + padding * 2)
-    roi_x1 = max(0, x)
-    roi_x2 = min(img.shape[1], x + text_width + padding * 2)
-    
-    if roi_y2 > roi_y1 and roi_x2 > roi_x1:
-        roi_h = roi_y2 - roi_y1
-        roi_w = roi_x2 - roi_x1
-        
-        # Ajusta tamanho do texto renderizado para corresponder ao ROI
-        text_roi_h = min(max_text_h, roi_h)
-        text_roi_w = min(max_text_w, roi_w)
-        
-        # Extrai região do texto
-        text_roi = text_array[:text_roi_h, :text_roi_w]
-        
-        # Extrai ROI da imagem
-        roi = img[roi_y1:roi_y1+text_roi_h, roi_x1:roi_x1+text_roi_w].copy()
-        
-        # Alpha blending otimizado
-        if text_roi.shape[2] == 4:  # RGBA
-            # Garante que as dimensões sejam compatíveis
-            if roi.shape[:2] == text_roi.shape[:2]:
-                alpha = text_roi[:, :, 3:4].astype(np.float32) / 255.0
-                text_rgb = text_roi[:, :, :3].astype(np.float32)
-                text_bgr = text_rgb[:, :, ::-1]  # RGB para BGR
-                roi_float = roi.astype(np.float32)
-                
-                # Composição alpha (broadcasting seguro)
-                result = (1 - alpha) * roi_float + alpha * text_bgr
-                img[roi_y1:roi_y1+text_roi_h, roi_x1:roi_x1+text_roi_w] = result.astype(np.uint8)
-            else:
-                # Dimensões incompatíveis - composição simples sem alpha
-                img[roi_y1:roi_y1+min(roi.shape[0], text_roi.shape[0]), 
-                    roi_x1:roi_x1+min(roi.shape[1], text_roi.shape[1])] = \
-                    text_roi[:min(roi.shape[0], text_roi.shape[0]), 
-                            :min(roi.shape[1], text_roi.shape[1]), :3][:, :, ::-1]
-        else:
-            # Sem alpha, composição direta
-            if roi.shape == text_roi[:, :, ::-1].shape:
-                img[roi_y1:roi_y1+text_roi_h, roi_x1:roi_x1+text_roi_w] = text_roi[:, :, ::-1]
-            else:
-                # Ajusta tamanhos se necessário
-                h_min = min(roi.shape[0], text_roi.shape[0])
-                w_min = min(roi.shape[1], text_roi.shape[1])
-                img[roi_y1:roi_y1+h_min, roi_x1:roi_x1+w_min] = text_roi[:h_min, :w_min, ::-1]
-    
-    return text_width, text_height
+    # Arrays ficam no cache e são compartilhados entre chamadas: somente leitura
+    for array in (text_bgr, alpha, inv_alpha):
+        array.flags.writeable = False
+    return text_bgr, alpha, inv_alpha, text_width, text_height
 
 
+@lru_cache(maxsize=512)
 def get_text_size_utf8(text, font_scale, font_path=None):
-    """Retorna o tamanho que o texto ocuparia (otimizado)"""
+    """Retorna o tamanho que o texto ocuparia (em cache: os textos da UI se repetem a cada frame)"""
     # Se não tem acento, usa cv2 (muito mais rápido)
     if not _has_accent(text):
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        text_size, _ = cv2.getTextSize(text, font, font_scale, 2)
-        return text_size[0], text_size[1]
+        return _cv2_text_size(text, font_scale, 2)
     
     # Para texto com acentos, usa cache de fonte
     base_font_size = max(10, int(font_scale * 30))
     font = _get_cached_font(base_font_size, font_path)
     
-    # Cria imagem temporária mínima para medir
-    img_temp = Image.new('RGB', (100, 100), (0, 0, 0))
-    draw = ImageDraw.Draw(img_temp)
-    bbox = draw.textbbox((0, 0), text, font=font)
+    # Mede com o contexto compartilhado, sem criar imagem a cada chamada
+    bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=font)
     
     return (bbox[2] - bbox[0], bbox[3] - bbox[1])
 
 
+@lru_cache(maxsize=256)
+def fit_text(text, font_scale, max_width, min_chars=10):
+    """Trunca o texto com "..." até caber em max_width (nunca abaixo de min_chars caracteres); em cache"""
+    text_width, _ = get_text_size_utf8(text, font_scale)
+    if text_width <= max_width:
+        return text
+    if len(text) <= min_chars:
+        return text
+    # Busca binária pelo maior corte que cabe (a largura cresce com o número
+    # de caracteres): O(log n) medições em vez de uma por caractere removido
+    lo, hi = min_chars, len(text) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if get_text_size_utf8(text[:mid] + "...", font_scale)[0] <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "..."
+
+
+@lru_cache(maxsize=128)
+def _rasterize_shadowed(text, font_size, color_rgb, shadow_rgb, shadow_offset, font_path):
+    """Compõe texto e sombra num só bloco em cache: (BGR, alpha, 1 - alpha, dx, dy) com o deslocamento do bloco"""
+    text_bgr, text_alpha, _, _, _ = _rasterize(text, font_size, color_rgb, font_path)
+    shadow_bgr, shadow_alpha, _, _, _ = _rasterize(text, font_size, shadow_rgb, font_path)
+    h, w = text_alpha.shape
+    sx, sy = shadow_offset
+    # Bloco que cobre as duas camadas; (dx, dy) é a posição do seu canto em
+    # relação ao canto da camada do texto
+    dx, dy = min(0, sx), min(0, sy)
+    block_w, block_h = w + abs(sx), h + abs(sy)
+    
+    # Camadas pré-multiplicadas no bloco: texto sobre a sombra
+    color = np.zeros((block_h, block_w, 3), dtype=np.float32)
+    alpha = np.zeros((block_h, block_w), dtype=np.float32)
+    ys, xs = sy - dy, sx - dx
+    alpha[ys:ys + h, xs:xs + w] = shadow_alpha
+    color[ys:ys + h, xs:xs + w] = shadow_bgr * shadow_alpha[:, :, None]
+    ty, tx = -dy, -dx
+    keep = 1.0 - text_alpha
+    color[ty:ty + h, tx:tx + w] *= keep[:, :, None]
+    color[ty:ty + h, tx:tx + w] += text_bgr * text_alpha[:, :, None]
+    alpha[ty:ty + h, tx:tx + w] = 1.0 - keep * (1.0 - alpha[ty:ty + h, tx:tx + w])
+    
+    # Volta para cor "reta" (não multiplicada) para o mesmo blendLinear do texto simples
+    block_bgr = np.divide(color, alpha[:, :, None], out=np.zeros_like(color), where=alpha[:, :, None] > 0)
+    block_bgr = np.clip(block_bgr + 0.5, 0, 255).astype(np.uint8)
+    inv_alpha = 1.0 - alpha
+    for array in (block_bgr, alpha, inv_alpha):
+        array.flags.writeable = False
+    return block_bgr, alpha, inv_alpha, dx, dy
+
+
 def put_text_with_shadow(img, text, position, font_scale, color, thickness=2, 
                          shadow_offset=(2, 2), shadow_color=(0, 0, 0), font_path=None):
     """Renderiza texto com sombra usando UTF-8 (otimizado)"""
     x, y = position
-    shadow_x = x + shadow_offset[0]
-    shadow_y = y + shadow_offset[1]
     
-    # Desenha sombra primeiro
-    put_text_utf8(img, text, (shadow_x, shadow_y), font_scale, shadow_color, thickness, font_path)
+    if not _has_accent(text):
+        # Sem acento: sombra e texto direto com cv2.putText (mesmo traço de put_text_utf8)
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        line_type = cv2.LINE_AA if font_scale > 0.6 else cv2.LINE_8
+        cv2.putText(img, text, (x + shadow_offset[0], y + shadow_offset[1]), font, font_scale,
+                    shadow_color, thickness, line_type)
+        cv2.putText(img, text, position, font, font_scale, color, thickness, line_type)
+        return _cv2_text_size(text, font_scale, thickness)
     
-    # Desenha texto principal
-    text_width, text_height = put_text_utf8(img, text, position, font_scale, color, thickness, font_path)
+    # Com acento: sombra e texto rasterizados juntos num bloco em cache,
+    # aplicado com um único blend
+    if font_path is None:
+        font_path = get_font_path()
+    base_font_size = max(10, int(font_scale * 30))
+    block_bgr, alpha, inv_alpha, dx, dy = _rasterize_shadowed(
+        text, base_font_size, (color[2], color[1], color[0]),
+        (shadow_color[2], shadow_color[1], shadow_color[0]), tuple(shadow_offset), font_path)
     
-    return text_width, text_height
+    # Canto do bloco na imagem (a camada do texto começa em y - padding),
+    # recortado aos limites da imagem
+    padding = 3
+    bx, by = x + dx, y - padding + dy
+    x0, y0 = max(bx, 0), max(by, 0)
+    x1 = min(bx + block_bgr.shape[1], img.shape[1])
+    y1 = min(by + block_bgr.shape[0], img.shape[0])
+    if x1 > x0 and y1 > y0:
+        roi = img[y0:y1, x0:x1]
+        crop = (slice(y0 - by, y1 - by), slice(x0 - bx, x1 - bx))
+        cv2.blendLinear(block_bgr[crop], roi, alpha[crop], inv_alpha[crop], dst=roi)
+    
+    return get_text_size_utf8(text, font_scale, font_path)
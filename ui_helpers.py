@@ -2,6 +2,30 @@
 Módulo com funções auxiliares para desenho de interface moderna
 """
 import cv2
+import numpy as np
+from functools import lru_cache
+
+# Cache dos blocos de gradiente vertical (os painéis repetem tamanho e cores)
+_gradient_cache = {}
+
+
+@lru_cache(maxsize=64)
+def _solid_patch(height, width, color):
+    """Bloco de cor sólida (em cache, somente leitura) usado nos blends de retângulos"""
+    patch = np.empty((height, width, 3), dtype=np.uint8)
+    patch[:] = color
+    patch.flags.writeable = False
+    return patch
+
+
+def blend_rect(img, pt1, pt2, color, alpha):
+    """Mistura um retângulo preenchido (pt1 a pt2, inclusive) apenas na sua região da imagem"""
+    x0, y0 = max(pt1[0], 0), max(pt1[1], 0)
+    x1, y1 = min(pt2[0] + 1, img.shape[1]), min(pt2[1] + 1, img.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return
+    roi = img[y0:y1, x0:x1]
+    cv2.addWeighted(_solid_patch(y1 - y0, x1 - x0, tuple(color)), alpha, roi, 1 - alpha, 0, dst=roi)
 
 
 def draw_modern_panel(img, x, y, width, height, bg_color=(20, 20, 20), border_color=(100, 100, 100), alpha=0.85, shadow=True):
@@ -14,14 +38,10 @@ def draw_modern_panel(img, x, y, width, height, bg_color=(20, 20, 20), border_co
         shadow_offset = 3
         shadow_pt1 = (x + shadow_offset, y + shadow_offset)
         shadow_pt2 = (x + width + shadow_offset, y + height + shadow_offset)
-        shadow_overlay = img.copy()
-        cv2.rectangle(shadow_overlay, shadow_pt1, shadow_pt2, (0, 0, 0), -1)
-        cv2.addWeighted(shadow_overlay, 0.3, img, 0.7, 0, img)
+        blend_rect(img, shadow_pt1, shadow_pt2, (0, 0, 0), 0.3)
     
-    # Fundo do painel
-    overlay = img.copy()
-    cv2.rectangle(overlay, pt1, pt2, bg_color, -1)
-    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+    # Fundo do painel (blend só na região do painel, sem copiar a imagem inteira)
+    blend_rect(img, pt1, pt2, bg_color, alpha)
     
     # Borda com gradiente (simulado com borda dupla)
     cv2.rectangle(img, pt1, pt2, (border_color[0]//2, border_color[1]//2, border_color[2]//2), 1)
@@ -41,9 +61,7 @@ def draw_status_badge(img, x, y, text, status_color, bg_color=(30, 30, 30), alph
     badge_height = text_height + padding * 2
     
     # Desenha fundo do badge
-    overlay = img.copy()
-    cv2.rectangle(overlay, (x, y), (x + badge_width, y + badge_height), bg_color, -1)
-    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+    blend_rect(img, (x, y), (x + badge_width, y + badge_height), bg_color, alpha)
     
     # Desenha borda colorida
     cv2.rectangle(img, (x, y), (x + badge_width, y + badge_height), status_color, 2)
@@ -56,24 +74,62 @@ def draw_status_badge(img, x, y, text, status_color, bg_color=(30, 30, 30), alph
     return badge_width, badge_height
 
 
+def clear_gradient_cache():
+    """Descarta os gradientes em cache (os tamanhos antigos não voltam a ser usados após redimensionar)"""
+    _gradient_cache.clear()
+
+
+def _vertical_gradient(width, height, color1, color2):
+    """Retorna (em cache) o bloco height x (width + 1) com o gradiente vertical de color1 a color2"""
+    key = (width, height, color1, color2)
+    strip = _gradient_cache.get(key)
+    if strip is None:
+        # Mesma interpolação (e truncamento) da versão linha a linha; a ordem
+        # dos canais é invertida como em cv2.line(..., (b, g, r))
+        ratios = (np.arange(height) / height)[:, None]
+        column = (np.array(color1[::-1], dtype=np.float64) * (1 - ratios)
+                  + np.array(color2[::-1], dtype=np.float64) * ratios).astype(np.uint8)
+        # A linha de x até x + width inclui as duas pontas: width + 1 colunas
+        strip = np.ascontiguousarray(np.broadcast_to(column[:, None, :], (height, width + 1, 3)))
+        _gradient_cache[key] = strip
+    return strip
+
+
+def _horizontal_gradient(width, height, color1, color2):
+    """Retorna (em cache) o bloco (height + 1) x width com o gradiente horizontal de color1 a color2"""
+    key = ('h', width, height, color1, color2)
+    block = _gradient_cache.get(key)
+    if block is None:
+        # Uma coluna por x (de x até x + width - 1), cada uma com height + 1
+        # linhas como o cv2.line vertical; mesma interpolação e truncamento
+        ratios = (np.arange(width) / width)[:, None]
+        row = (np.array(color1[::-1], dtype=np.float64) * (1 - ratios)
+               + np.array(color2[::-1], dtype=np.float64) * ratios).astype(np.uint8)
+        block = np.ascontiguousarray(np.broadcast_to(row[None, :, :], (height + 1, width, 3)))
+        _gradient_cache[key] = block
+    return block
+
+
 def draw_gradient_rect(img, x, y, width, height, color1, color2, alpha=0.7, vertical=True):
     """Desenha um retângulo com gradiente"""
-    overlay = img.copy()
+    # Blend só na região do retângulo (recortada aos limites da imagem)
     if vertical:
-        for i in range(height):
-            ratio = i / height
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            cv2.line(overlay, (x, y + i), (x + width, y + i), (b, g, r), 1)
+        x1, y1 = x + width + 1, y + height
+        gradient = _vertical_gradient
     else:
-        for i in range(width):
-            ratio = i / width
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            cv2.line(overlay, (x + i, y), (x + i, y + height), (b, g, r), 1)
-    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+        x1, y1 = x + width, y + height + 1
+        gradient = _horizontal_gradient
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x1, img.shape[1]), min(y1, img.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return
+    block = gradient(width, height, tuple(color1), tuple(color2))[y0 - y:y1 - y, x0 - x:x1 - x]
+    roi = img[y0:y1, x0:x1]
+    if alpha >= 0.999:
+        # Opaco: o blend daria o próprio gradiente
+        np.copyto(roi, block)
+        return
+    cv2.addWeighted(block, alpha, roi, 1 - alpha, 0, dst=roi)
 
 
 def draw_progress_bar(img, x, y, width, height, progress, color, bg_color=(50, 50, 50)):
@@ -92,3 +148,67 @@ def draw_separator(img, x, y, length, color=(150, 150, 150), thickness=1):
     """Desenha uma linha separadora moderna"""
     cv2.line(img, (x, y), (x + length, y), color, thickness)
 
+
+
+def capture_overlay(render, height, width, origin=(0, 0)):
+    """Pré-renderiza uma camada estática e retorna (x, y, cor pré-multiplicada, 1 - alpha, opaca)
+
+    origin é a posição (x, y) do canvas de captura na imagem onde a camada será aplicada.
+    """
+    # Renderiza a camada sobre fundo preto e sobre fundo branco: no preto
+    # sobra a cor já multiplicada pelo alpha; a diferença entre os dois dá
+    # a transparência (255 onde nada foi desenhado, 0 onde é opaco)
+    black = np.zeros((height, width, 3), dtype=np.uint8)
+    white = np.full((height, width, 3), 255, dtype=np.uint8)
+    render(black)
+    render(white)
+    inv_alpha = cv2.subtract(white, black, dst=white)
+    
+    # Guarda apenas o retângulo onde a camada desenhou algo
+    touched = np.any((black != 0) | (inv_alpha != 255), axis=2).astype(np.uint8)
+    x, y, w, h = cv2.boundingRect(touched)
+    if w == 0 or h == 0:
+        return None
+    premultiplied = black[y:y+h, x:x+w].copy()
+    inv_alpha = inv_alpha[y:y+h, x:x+w].copy()
+    return x + origin[0], y + origin[1], premultiplied, inv_alpha, not inv_alpha.any()
+
+
+def split_overlay(overlay, split_x):
+    """Divide uma camada de capture_overlay na coluna split_x da imagem: (parte à esquerda, parte à direita)"""
+    if overlay is None:
+        return None, None
+    x, y, premultiplied, inv_alpha, opaque = overlay
+    cut = min(max(split_x - x, 0), premultiplied.shape[1])
+    parts = []
+    for x0, x1 in ((0, cut), (cut, premultiplied.shape[1])):
+        if x1 <= x0:
+            parts.append(None)
+            continue
+        part_inv = inv_alpha[:, x0:x1]
+        parts.append((x + x0, y, premultiplied[:, x0:x1], part_inv, opaque or not part_inv.any()))
+    return tuple(parts)
+
+
+def blend_overlay(img, overlay):
+    """Aplica sobre img uma camada capturada por capture_overlay (apenas no seu retângulo)"""
+    if overlay is None:
+        return
+    x, y, premultiplied, inv_alpha, opaque = overlay
+    h, w = premultiplied.shape[:2]
+    # Recorta aos limites da imagem (janela menor que a camada, ex.: o menu
+    # lateral com largura mínima numa janela estreita)
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, img.shape[1]), min(y + h, img.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return
+    if (x1 - x0, y1 - y0) != (w, h):
+        premultiplied = premultiplied[y0 - y:y1 - y, x0 - x:x1 - x]
+        inv_alpha = inv_alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+    roi = img[y0:y1, x0:x1]
+    if opaque:
+        np.copyto(roi, premultiplied)
+    else:
+        # roi = roi * (1 - alpha) + cor * alpha, direto na view da imagem
+        cv2.multiply(roi, inv_alpha, dst=roi, scale=1.0 / 255)
+        cv2.add(roi, premultiplied, dst=roi)
@@ -2,8 +2,107 @@
 Módulo responsável pela renderização da interface do usuário
 """
 import cv2
-from ui_helpers import draw_gradient_rect, draw_separator, draw_progress_bar
-from text_renderer import put_text_utf8, put_text_with_shadow, get_text_size_utf8
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from ui_helpers import draw_gradient_rect, draw_separator, draw_progress_bar, blend_rect
+from text_renderer import put_text_utf8, put_text_with_shadow, get_text_size_utf8, fit_text
+
+# Itens do menu lateral: (modo, tecla, nome exibido, descrição)
+POSES_INFO = (
+    ('enquadramento', '1', 'Enquadramento', 'Centralize-se na câmera'),
+    ('double_biceps', '2', 'Duplo Bíceps', 'Braços elevados e contraídos'),
+    ('back_double_biceps', '3', 'Duplo Bíceps Costas', 'Costas para a câmera'),
+    ('side_chest', '4', 'Side Chest', 'Corpo de lado, braço contraído'),
+    ('most_muscular', '5', 'Most Muscular', 'Braços abaixo dos ombros'),
+)
+
+# Textos fixos do menu lateral
+SIDEBAR_TITLE = "BODYVISION"
+SIDEBAR_SUBTITLE = "Sistema de Análise de Poses"
+SIDEBAR_FOOTER = "Pressione [Q] para sair"
+# Cores do texto dos itens (descrição já escurecida: 50 níveis abaixo do nome)
+SELECTED_TEXT = (150, 230, 255)
+SELECTED_DESC = (SELECTED_TEXT[0] - 50, SELECTED_TEXT[1] - 50, SELECTED_TEXT[2] - 50)
+UNSELECTED_TEXT = (180, 180, 200)
+UNSELECTED_DESC = (UNSELECTED_TEXT[0] - 50, UNSELECTED_TEXT[1] - 50, UNSELECTED_TEXT[2] - 50)
+
+# Estilo do esqueleto (cores do brilho já calculadas: 1/3 da cor da linha)
+ARM_LINE_COLOR = (0, 200, 255)
+ARM_GLOW_COLOR = (ARM_LINE_COLOR[0] // 3, ARM_LINE_COLOR[1] // 3, ARM_LINE_COLOR[2] // 3)
+LEG_LINE_COLOR = (255, 100, 0)
+LEG_GLOW_COLOR = (LEG_LINE_COLOR[0] // 3, LEG_LINE_COLOR[1] // 3, LEG_LINE_COLOR[2] // 3)
+SKELETON_LINE_THICKNESS = 4
+JOINT_RADIUS = 6
+# Chaves dos pontos de cada membro (ombro/quadril, cotovelo/joelho, punho/tornozelo)
+_ARM_KEYS = {"LEFT": ("LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST"),
+             "RIGHT": ("RIGHT_SHOULDER", "RIGHT_ELBOW", "RIGHT_WRIST")}
+_LEG_KEYS = {"LEFT": ("LEFT_HIP", "LEFT_KNEE", "LEFT_ANKLE"),
+             "RIGHT": ("RIGHT_HIP", "RIGHT_KNEE", "RIGHT_ANKLE")}
+
+
+def _joint_sprite(color):
+    """Pré-renderiza um ponto de articulação com anel preto: retorna (cor, máscara)"""
+    half = JOINT_RADIUS + 2
+    size = 2 * half + 1
+    sprite = np.zeros((size, size, 3), dtype=np.uint8)
+    mask = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(sprite, (half, half), JOINT_RADIUS + 2, (0, 0, 0), -1)
+    cv2.circle(mask, (half, half), JOINT_RADIUS + 2, 1, -1)
+    cv2.circle(sprite, (half, half), JOINT_RADIUS, color, -1)
+    cv2.circle(mask, (half, half), JOINT_RADIUS, 1, -1)
+    sprite.flags.writeable = False
+    mask.flags.writeable = False
+    return sprite, mask
+
+
+# Pontos das articulações dos braços (anel preto + centro) pré-renderizados:
+# um cv2.copyTo no lugar de dois cv2.circle. As pernas têm um círculo só e
+# continuam com cv2.circle, que já é uma única chamada
+JOINT_WHITE_RING = _joint_sprite((255, 255, 255))
+JOINT_ARM_RING = _joint_sprite(ARM_LINE_COLOR)
+
+
+def _draw_joint(frame, center, joint):
+    """Cola o sprite de articulação centrado em center (recortado nas bordas)"""
+    sprite, mask = joint
+    size = sprite.shape[0]
+    x0, y0 = center[0] - size // 2, center[1] - size // 2
+    frame_h, frame_w = frame.shape[:2]
+    if x0 >= 0 and y0 >= 0 and x0 + size <= frame_w and y0 + size <= frame_h:
+        cv2.copyTo(sprite, mask, dst=frame[y0:y0 + size, x0:x0 + size])
+        return
+    fx0, fy0 = max(x0, 0), max(y0, 0)
+    fx1, fy1 = min(x0 + size, frame_w), min(y0 + size, frame_h)
+    if fx1 <= fx0 or fy1 <= fy0:
+        return
+    cv2.copyTo(sprite[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0], mask[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0],
+               dst=frame[fy0:fy1, fx0:fx1])
+
+
+# Texto pequeno e dinâmico (ângulos, FPS): fonte PLAIN com LINE_8, mais barata
+# de rasterizar que SIMPLEX/LINE_AA e sem diferença visível nesse tamanho
+SMALL_TEXT_FONT = cv2.FONT_HERSHEY_PLAIN
+ANGLE_FONT_SCALE = 1.2
+# Rótulos dos ângulos (0-180 graus) e seus tamanhos, formatados e medidos uma vez
+ANGLE_LABELS = tuple(
+    (f"{angle}°", cv2.getTextSize(f"{angle}°", SMALL_TEXT_FONT, ANGLE_FONT_SCALE, 2)[0])
+    for angle in range(181)
+)
+
+
+@lru_cache(maxsize=128)
+def _wrap_feedback(text, max_chars):
+    """Quebra o feedback em linhas de até max_chars, preferindo quebrar após ';'"""
+    lines = []
+    while len(text) > max_chars:
+        split_index = text.rfind(';', 0, max_chars)
+        if split_index == -1:
+            split_index = max_chars
+        lines.append(text[:split_index + 1].strip())
+        text = text[split_index + 1:].strip()
+    lines.append(text)
+    return tuple(lines)
 
 
 def render_feedback_panel(frame, pose_quality, camera_width, camera_height, offset_x=0, offset_y=0):
@@ -11,17 +110,9 @@ def render_feedback_panel(frame, pose_quality, camera_width, camera_height, offs
     # Layout responsivo
     scale_factor = camera_width / 1280.0
     
-    # Quebra de linha do texto
-    lines = []
+    # Quebra de linha do texto (em cache: o feedback se repete entre frames)
     max_chars = int(50 * scale_factor)  # Reduzido para caber na área da câmera
-    pose_quality_temp = pose_quality
-    while len(pose_quality_temp) > max_chars:
-        split_index = pose_quality_temp.rfind(';', 0, max_chars)
-        if split_index == -1:
-            split_index = max_chars
-        lines.append(pose_quality_temp[:split_index + 1].strip())
-        pose_quality_temp = pose_quality_temp[split_index + 1:].strip()
-    lines.append(pose_quality_temp)
+    lines = _wrap_feedback(pose_quality, max_chars)
 
     # Painel de feedback (ajustado para área da câmera)
     panel_y = offset_y + int(15 * scale_factor)
@@ -79,15 +170,17 @@ def render_info_panel(frame, mode_display, fps, camera_width, camera_height, off
     scale_factor = camera_width / 1280.0  # Fator de escala baseado em 1280px
     fps_x = offset_x + int(20 * scale_factor)
     fps_y = offset_y + int(30 * scale_factor)
-    font_scale_fps = 0.7 * scale_factor
+    font_scale_fps = 1.3 * scale_factor
     
     # FPS com cor baseada na performance
     fps_color = (0, 255, 0) if fps >= 20 else (0, 165, 255) if fps >= 10 else (0, 0, 255)
     fps_text = f"FPS: {int(fps)}"
     
     # Renderiza FPS com sombra para melhor legibilidade
-    put_text_with_shadow(frame, fps_text, (fps_x, fps_y), 
-                        font_scale_fps, fps_color, thickness=2)
+    cv2.putText(frame, fps_text, (fps_x + 2, fps_y + 2), SMALL_TEXT_FONT,
+                font_scale_fps, (0, 0, 0), 2, cv2.LINE_8)
+    cv2.putText(frame, fps_text, (fps_x, fps_y), SMALL_TEXT_FONT,
+                font_scale_fps, fps_color, 2, cv2.LINE_8)
 
 
 def render_instructions_panel(frame, camera_width, camera_height, offset_x=0, offset_y=0):
@@ -133,67 +226,69 @@ def render_instructions_panel(frame, camera_width, camera_height, offset_x=0, of
                         instruction_scale, (240, 240, 240), thickness=1)
 
 
-def render_sidebar_menu(frame, current_mode, mode_names, camera_width, h):
-    """Renderiza o menu lateral moderno à direita da câmera"""
-    # Menu responsivo baseado na altura
-    # Calcula sidebar_width baseado no frame atual (já tem o tamanho certo)
-    sidebar_x = camera_width
-    sidebar_width = frame.shape[1] - camera_width
-    
+@dataclass(frozen=True)
+class SidebarLayout:
+    """Posições e escalas do menu lateral, já multiplicadas pelo fator de escala"""
+    scale_factor: float
+    header_height: int
+    title_scale: float
+    title_x: int
+    title_y: int
+    subtitle_scale: float
+    subtitle_x: int
+    subtitle_y: int
+    separator_x: int
+    separator_y: int
+    separator_width: int
+    item_x: int
+    item_width: int
+    item_height: int
+    item_spacing: int
+    start_y: int
+    selector_width: int
+    key_badge_size: int
+    key_dx: int
+    key_dy: int
+    key_scale: float
+    name_dx: int
+    name_dy: int
+    name_scale: float
+    desc_dy: int
+    desc_scale: float
+    max_desc_width: int
+    check_dx: int
+    check_dy: int
+    check_radius: int
+    check_points: tuple
+    footer_height: int
+    footer_y: int
+    footer_scale: float
+    footer_text_x: int
+    footer_text_y: int
+    footer_separator_y: int
+
+
+@lru_cache(maxsize=8)
+def _sidebar_layout(sidebar_x, sidebar_width, h):
+    """Calcula o layout do menu lateral (em cache enquanto posição e tamanho não mudarem)"""
     # Calcula scale_factor baseado na altura
     scale_factor = h / 720.0  # Baseado em 720px de altura
     
-    # Fundo do sidebar com gradiente
-    draw_gradient_rect(frame, sidebar_x, 0, sidebar_width, h,
-                      (20, 20, 30), (15, 15, 25), alpha=1.0, vertical=True)
-    
-    # Linha separadora entre câmera e menu
-    cv2.line(frame, (sidebar_x, 0), (sidebar_x, h), (80, 80, 100), 3)
-    cv2.line(frame, (sidebar_x + 1, 0), (sidebar_x + 1, h), (50, 50, 70), 1)
-    
-    # Cabeçalho do menu
+    # Cabeçalho: título centralizado e subtítulo
     header_height = int(120 * scale_factor)
-    header_y = 0
-    draw_gradient_rect(frame, sidebar_x, header_y, sidebar_width, header_height,
-                      (30, 30, 50), (25, 25, 45), alpha=1.0, vertical=True)
-    
-    # Título do menu
-    title_text = "BODYVISION"
     title_scale = 1.0 * scale_factor
-    title_width, _ = get_text_size_utf8(title_text, title_scale)
-    title_x = sidebar_x + (sidebar_width - title_width) // 2
+    title_width, _ = get_text_size_utf8(SIDEBAR_TITLE, title_scale)
     title_y = int(50 * scale_factor)
-    
-    # Título com sombra
-    put_text_with_shadow(frame, title_text, (title_x, title_y), 
-                        title_scale, (100, 200, 255), thickness=3)
-    
-    # Subtítulo
-    subtitle_text = "Sistema de Análise de Poses"
     subtitle_scale = 0.45 * scale_factor
-    subtitle_width, _ = get_text_size_utf8(subtitle_text, subtitle_scale)
-    subtitle_x = sidebar_x + (sidebar_width - subtitle_width) // 2
-    put_text_utf8(frame, subtitle_text, (subtitle_x, title_y + int(35 * scale_factor)), 
-                 subtitle_scale, (150, 150, 180), thickness=1)
+    subtitle_width, _ = get_text_size_utf8(SIDEBAR_SUBTITLE, subtitle_scale)
     
     # Separador após header
     separator_y = header_height + int(10 * scale_factor)
-    draw_separator(frame, sidebar_x + int(20 * scale_factor), separator_y, 
-                  sidebar_width - int(40 * scale_factor), (80, 100, 130), 2)
-    
-    # Lista de poses
-    poses_info = [
-        ('enquadramento', '1', 'Enquadramento', 'Centralize-se na câmera'),
-        ('double_biceps', '2', 'Duplo Bíceps', 'Braços elevados e contraídos'),
-        ('back_double_biceps', '3', 'Duplo Bíceps Costas', 'Costas para a câmera'),
-        ('side_chest', '4', 'Side Chest', 'Corpo de lado, braço contraído'),
-        ('most_muscular', '5', 'Most Muscular', 'Braços abaixo dos ombros')
-    ]
     
     # Calcula espaço disponível para itens (descontando header, separadores e footer)
     footer_height = int(100 * scale_factor)
     available_height = h - separator_y - footer_height - int(40 * scale_factor)
-    num_items = len(poses_info)
+    num_items = len(POSES_INFO)
     
     # Ajusta item_height e spacing para caber todos os itens
     min_item_height = int(90 * scale_factor)
@@ -202,196 +297,254 @@ def render_sidebar_menu(frame, current_mode, mode_names, camera_width, h):
     # Calcula altura ideal dos itens
     total_spacing = min_spacing * (num_items - 1)
     item_height = max(min_item_height, int((available_height - total_spacing) / num_items))
-    item_spacing = min_spacing
     
-    start_y = separator_y + int(20 * scale_factor)
+    # Painel de cada item e seus elementos (deslocamentos relativos ao item)
+    item_width = sidebar_width - int(30 * scale_factor)
+    key_badge_size = int(35 * scale_factor)
+    name_dx = key_badge_size + int(20 * scale_factor)
     
-    for idx, (mode_key, key_num, display_name, description) in enumerate(poses_info):
-        item_y = start_y + idx * (item_height + item_spacing)
-        
-        # Verifica se é a pose selecionada
-        is_selected = (mode_key == current_mode)
-        
-        # Cores baseadas na seleção
-        if is_selected:
-            bg_color1 = (30, 60, 90)
-            bg_color2 = (40, 80, 120)
-            border_color = (100, 200, 255)
-            text_color = (150, 230, 255)
-            key_bg = (50, 150, 200)
-        else:
-            bg_color1 = (25, 25, 35)
-            bg_color2 = (35, 35, 45)
-            border_color = (60, 60, 80)
-            text_color = (180, 180, 200)
-            key_bg = (60, 60, 80)
-        
-        # Painel do item
-        item_width = sidebar_width - int(30 * scale_factor)
-        item_x = sidebar_x + int(15 * scale_factor)
-        
-        # Gradiente do item
-        draw_gradient_rect(frame, item_x, item_y, item_width, item_height,
-                          bg_color1, bg_color2, alpha=0.95, vertical=True)
-        
-        # Borda
-        border_thickness = 3 if is_selected else 2
-        cv2.rectangle(frame, (item_x, item_y), 
-                     (item_x + item_width, item_y + item_height),
-                     border_color, border_thickness)
-        
-        # Indicador de seleção (barra lateral)
-        if is_selected:
-            cv2.rectangle(frame, (item_x, item_y), 
-                         (item_x + int(6 * scale_factor), item_y + item_height),
-                         (100, 200, 255), -1)
-        
-        # Badge da tecla
-        key_badge_size = int(35 * scale_factor)
-        key_x = item_x + int(15 * scale_factor)
-        key_y = item_y + int(25 * scale_factor)
-        
-        # Círculo do badge
-        cv2.circle(frame, (key_x + key_badge_size // 2, key_y + key_badge_size // 2),
-                  key_badge_size // 2 + 2, (0, 0, 0), -1)
-        cv2.circle(frame, (key_x + key_badge_size // 2, key_y + key_badge_size // 2),
-                  key_badge_size // 2, key_bg, -1)
-        
-        # Texto da tecla (sem acentuação, pode usar cv2)
-        key_scale = 0.7 * scale_factor
-        key_width, key_height = get_text_size_utf8(key_num, key_scale)
-        key_text_x = key_x + (key_badge_size - key_width) // 2
-        key_text_y = key_y + (key_badge_size + key_height) // 2
-        put_text_utf8(frame, key_num, (key_text_x, key_text_y), 
-                     key_scale, (255, 255, 255), thickness=2)
-        
-        # Nome da pose
-        name_x = item_x + key_badge_size + int(20 * scale_factor)
-        name_y = item_y + int(28 * scale_factor)
-        name_scale = 0.6 * scale_factor
-        put_text_utf8(frame, display_name, (name_x, name_y), 
-                     name_scale, text_color, thickness=2)
-        
-        # Descrição (ajustada para caber no item)
-        desc_y = name_y + int(22 * scale_factor)
-        desc_scale = 0.38 * scale_factor
-        desc_color = (text_color[0] - 50, text_color[1] - 50, text_color[2] - 50)
-        
-        # Trunca descrição se muito longa para caber
-        max_desc_width = item_width - (name_x - item_x) - int(40 * scale_factor)
-        desc_width, _ = get_text_size_utf8(description, desc_scale)
-        if desc_width > max_desc_width:
-            # Tenta truncar descrição
-            truncated = description
-            while desc_width > max_desc_width and len(truncated) > 10:
-                truncated = truncated[:-1]
-                desc_width, _ = get_text_size_utf8(truncated + "...", desc_scale)
-            description = truncated + "..." if len(truncated) < len(description) else description
-        
-        put_text_utf8(frame, description, (name_x, desc_y), 
-                     desc_scale, desc_color, thickness=1)
-        
-        # Ícone de seleção (se estiver selecionado)
-        if is_selected:
-            check_x = item_x + item_width - int(35 * scale_factor)
-            check_y = item_y + int(25 * scale_factor)
-            check_radius = int(12 * scale_factor)
-            cv2.circle(frame, (check_x, check_y), check_radius, (0, 255, 100), -1)
-            cv2.circle(frame, (check_x, check_y), check_radius + 2, (0, 200, 80), 2)
-            # Checkmark
-            cv2.line(frame, (check_x - int(5 * scale_factor), check_y), 
-                    (check_x - int(2 * scale_factor), check_y + int(5 * scale_factor)), 
-                    (255, 255, 255), 2)
-            cv2.line(frame, (check_x - int(2 * scale_factor), check_y + int(5 * scale_factor)),
-                    (check_x + int(5 * scale_factor), check_y - int(3 * scale_factor)), 
-                    (255, 255, 255), 2)
-    
-    # Footer com instruções (já calculado acima)
+    # Footer com instruções
     footer_y = h - footer_height
-    draw_gradient_rect(frame, sidebar_x, footer_y, sidebar_width, footer_height,
-                      (15, 15, 25), (20, 20, 30), alpha=0.95, vertical=True)
-    
-    footer_text = "Pressione [Q] para sair"
     footer_scale = 0.5 * scale_factor
-    footer_width, _ = get_text_size_utf8(footer_text, footer_scale)
-    footer_text_x = sidebar_x + (sidebar_width - footer_width) // 2
-    footer_text_y = footer_y + int(40 * scale_factor)
-    put_text_utf8(frame, footer_text, (footer_text_x, footer_text_y), 
-                 footer_scale, (150, 150, 180), thickness=1)
+    footer_width, _ = get_text_size_utf8(SIDEBAR_FOOTER, footer_scale)
+    footer_separator_y = footer_y - int(10 * scale_factor)
+    
+    return SidebarLayout(
+        scale_factor=scale_factor,
+        header_height=header_height,
+        title_scale=title_scale,
+        title_x=sidebar_x + (sidebar_width - title_width) // 2,
+        title_y=title_y,
+        subtitle_scale=subtitle_scale,
+        subtitle_x=sidebar_x + (sidebar_width - subtitle_width) // 2,
+        subtitle_y=title_y + int(35 * scale_factor),
+        separator_x=sidebar_x + int(20 * scale_factor),
+        separator_y=separator_y,
+        separator_width=sidebar_width - int(40 * scale_factor),
+        item_x=sidebar_x + int(15 * scale_factor),
+        item_width=item_width,
+        item_height=item_height,
+        item_spacing=min_spacing,
+        start_y=separator_y + int(20 * scale_factor),
+        selector_width=int(6 * scale_factor),
+        key_badge_size=key_badge_size,
+        key_dx=int(15 * scale_factor),
+        key_dy=int(25 * scale_factor),
+        key_scale=0.7 * scale_factor,
+        name_dx=name_dx,
+        name_dy=int(28 * scale_factor),
+        name_scale=0.6 * scale_factor,
+        desc_dy=int(22 * scale_factor),
+        desc_scale=0.38 * scale_factor,
+        max_desc_width=item_width - name_dx - int(40 * scale_factor),
+        check_dx=item_width - int(35 * scale_factor),
+        check_dy=int(25 * scale_factor),
+        check_radius=int(12 * scale_factor),
+        # Checkmark: deslocamentos (x, y) dos três pontos em relação ao centro do ícone
+        check_points=((-int(5 * scale_factor), 0),
+                      (-int(2 * scale_factor), int(5 * scale_factor)),
+                      (int(5 * scale_factor), -int(3 * scale_factor))),
+        footer_height=footer_height,
+        footer_y=footer_y,
+        footer_scale=footer_scale,
+        footer_text_x=sidebar_x + (sidebar_width - footer_width) // 2,
+        footer_text_y=footer_y + int(40 * scale_factor),
+        footer_separator_y=footer_separator_y,
+    )
+
+
+def _draw_sidebar_chrome(frame, sidebar_x, sidebar_width, h, layout):
+    """Desenha as partes do menu que não dependem da pose selecionada (fundo, cabeçalho)"""
+    # Fundo do sidebar com gradiente
+    draw_gradient_rect(frame, sidebar_x, 0, sidebar_width, h,
+                      (20, 20, 30), (15, 15, 25), alpha=1.0, vertical=True)
+    
+    # Linha separadora entre câmera e menu
+    cv2.line(frame, (sidebar_x, 0), (sidebar_x, h), (80, 80, 100), 3)
+    cv2.line(frame, (sidebar_x + 1, 0), (sidebar_x + 1, h), (50, 50, 70), 1)
+    
+    # Cabeçalho do menu
+    draw_gradient_rect(frame, sidebar_x, 0, sidebar_width, layout.header_height,
+                      (30, 30, 50), (25, 25, 45), alpha=1.0, vertical=True)
+    
+    # Título com sombra
+    put_text_with_shadow(frame, SIDEBAR_TITLE, (layout.title_x, layout.title_y), 
+                        layout.title_scale, (100, 200, 255), thickness=3)
+    
+    # Subtítulo
+    put_text_utf8(frame, SIDEBAR_SUBTITLE, (layout.subtitle_x, layout.subtitle_y), 
+                 layout.subtitle_scale, (150, 150, 180), thickness=1)
+    
+    # Separador após header
+    draw_separator(frame, layout.separator_x, layout.separator_y, 
+                  layout.separator_width, (80, 100, 130), 2)
+
+
+def _draw_sidebar_footer(frame, sidebar_x, sidebar_width, layout):
+    """Desenha o footer do menu com as instruções"""
+    draw_gradient_rect(frame, sidebar_x, layout.footer_y, sidebar_width, layout.footer_height,
+                      (15, 15, 25), (20, 20, 30), alpha=0.95, vertical=True)
+    put_text_utf8(frame, SIDEBAR_FOOTER, (layout.footer_text_x, layout.footer_text_y), 
+                 layout.footer_scale, (150, 150, 180), thickness=1)
     
     # Separador antes do footer
-    draw_separator(frame, sidebar_x + int(20 * scale_factor), 
-                  footer_y - int(10 * scale_factor), 
-                  sidebar_width - int(40 * scale_factor), 
-                  (80, 100, 130), 2)
+    draw_separator(frame, layout.separator_x, layout.footer_separator_y, 
+                  layout.separator_width, (80, 100, 130), 2)
+
+
+def _draw_sidebar_item(frame, layout, item_x, item_y, pose_info, is_selected):
+    """Desenha um item do menu (painel, badge da tecla, nome, descrição e marca de seleção)"""
+    _, key_num, display_name, description = pose_info
+    item_width = layout.item_width
+    item_height = layout.item_height
+    key_badge_size = layout.key_badge_size
+    
+    # Cores baseadas na seleção
+    if is_selected:
+        bg_color1 = (30, 60, 90)
+        bg_color2 = (40, 80, 120)
+        border_color = (100, 200, 255)
+        text_color = SELECTED_TEXT
+        desc_color = SELECTED_DESC
+        key_bg = (50, 150, 200)
+    else:
+        bg_color1 = (25, 25, 35)
+        bg_color2 = (35, 35, 45)
+        border_color = (60, 60, 80)
+        text_color = UNSELECTED_TEXT
+        desc_color = UNSELECTED_DESC
+        key_bg = (60, 60, 80)
+    
+    # Gradiente do item
+    draw_gradient_rect(frame, item_x, item_y, item_width, item_height,
+                      bg_color1, bg_color2, alpha=0.95, vertical=True)
+    
+    # Borda
+    border_thickness = 3 if is_selected else 2
+    cv2.rectangle(frame, (item_x, item_y), 
+                 (item_x + item_width, item_y + item_height),
+                 border_color, border_thickness)
+    
+    # Indicador de seleção (barra lateral)
+    if is_selected:
+        cv2.rectangle(frame, (item_x, item_y), 
+                     (item_x + layout.selector_width, item_y + item_height),
+                     (100, 200, 255), -1)
+    
+    # Badge da tecla
+    key_x = item_x + layout.key_dx
+    key_y = item_y + layout.key_dy
+    
+    # Círculo do badge
+    cv2.circle(frame, (key_x + key_badge_size // 2, key_y + key_badge_size // 2),
+              key_badge_size // 2 + 2, (0, 0, 0), -1)
+    cv2.circle(frame, (key_x + key_badge_size // 2, key_y + key_badge_size // 2),
+              key_badge_size // 2, key_bg, -1)
+    
+    # Texto da tecla (sem acentuação, pode usar cv2)
+    key_width, key_height = get_text_size_utf8(key_num, layout.key_scale)
+    key_text_x = key_x + (key_badge_size - key_width) // 2
+    key_text_y = key_y + (key_badge_size + key_height) // 2
+    put_text_utf8(frame, key_num, (key_text_x, key_text_y), 
+                 layout.key_scale, (255, 255, 255), thickness=2)
+    
+    # Nome da pose
+    name_x = item_x + layout.name_dx
+    name_y = item_y + layout.name_dy
+    put_text_utf8(frame, display_name, (name_x, name_y), 
+                 layout.name_scale, text_color, thickness=2)
+    
+    # Descrição (truncada para caber no item)
+    description = fit_text(description, layout.desc_scale, layout.max_desc_width)
+    put_text_utf8(frame, description, (name_x, name_y + layout.desc_dy), 
+                 layout.desc_scale, desc_color, thickness=1)
+    
+    # Ícone de seleção (se estiver selecionado)
+    if is_selected:
+        check_x = item_x + layout.check_dx
+        check_y = item_y + layout.check_dy
+        check_radius = layout.check_radius
+        cv2.circle(frame, (check_x, check_y), check_radius, (0, 255, 100), -1)
+        cv2.circle(frame, (check_x, check_y), check_radius + 2, (0, 200, 80), 2)
+        # Checkmark
+        (ax, ay), (bx, by), (cx, cy) = layout.check_points
+        cv2.line(frame, (check_x + ax, check_y + ay), (check_x + bx, check_y + by), 
+                (255, 255, 255), 2)
+        cv2.line(frame, (check_x + bx, check_y + by), (check_x + cx, check_y + cy), 
+                (255, 255, 255), 2)
+
+
+def render_sidebar_menu(frame, current_mode, mode_names, camera_width, h):
+    """Renderiza o menu lateral moderno à direita da câmera"""
+    # Menu responsivo baseado na altura
+    # Calcula sidebar_width baseado no frame atual (já tem o tamanho certo)
+    sidebar_x = camera_width
+    sidebar_width = frame.shape[1] - camera_width
+    layout = _sidebar_layout(sidebar_x, sidebar_width, h)
+    
+    # Fundo e cabeçalho
+    _draw_sidebar_chrome(frame, sidebar_x, sidebar_width, h, layout)
+    
+    # Itens
+    for idx, pose_info in enumerate(POSES_INFO):
+        item_y = layout.start_y + idx * (layout.item_height + layout.item_spacing)
+        _draw_sidebar_item(frame, layout, layout.item_x, item_y, pose_info, pose_info[0] == current_mode)
+    
+    # Footer por último: com a altura mínima dos itens, o último deles
+    # passa por baixo do footer (semitransparente)
+    _draw_sidebar_footer(frame, sidebar_x, sidebar_width, layout)
 
 
 def render_pose_skeleton(frame, points, angle_left, angle_right, angle_left_knee, angle_right_knee, pose_mode):
     """Renderiza o esqueleto da pose com linhas e ângulos"""
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    arm_line_color = (0, 200, 255)
-    arm_line_thickness = 4
-    joint_radius = 6
+    arm_line_color = ARM_LINE_COLOR
+    arm_line_thickness = SKELETON_LINE_THICKNESS
     
     # Desenha braços
-    for side in ["LEFT", "RIGHT"]:
-        if f"{side}_SHOULDER" in points and f"{side}_ELBOW" in points and f"{side}_WRIST" in points:
-            shoulder_pos = points[f"{side}_SHOULDER"]
-            elbow_pos = points[f"{side}_ELBOW"]
-            wrist_pos = points[f"{side}_WRIST"]
-            
-            # Linhas com efeito glow
-            glow_color = (arm_line_color[0]//3, arm_line_color[1]//3, arm_line_color[2]//3)
-            cv2.line(frame, shoulder_pos, elbow_pos, glow_color, arm_line_thickness + 2)
-            cv2.line(frame, shoulder_pos, elbow_pos, arm_line_color, arm_line_thickness)
-            cv2.line(frame, elbow_pos, wrist_pos, glow_color, arm_line_thickness + 2)
-            cv2.line(frame, elbow_pos, wrist_pos, arm_line_color, arm_line_thickness)
-            
-            # Pontos nas articulações
-            cv2.circle(frame, shoulder_pos, joint_radius + 2, (0, 0, 0), -1)
-            cv2.circle(frame, shoulder_pos, joint_radius, (255, 255, 255), -1)
-            cv2.circle(frame, elbow_pos, joint_radius + 2, (0, 0, 0), -1)
-            cv2.circle(frame, elbow_pos, joint_radius, arm_line_color, -1)
-            cv2.circle(frame, wrist_pos, joint_radius + 2, (0, 0, 0), -1)
-            cv2.circle(frame, wrist_pos, joint_radius, (255, 255, 255), -1)
-            
-            # Badge do ângulo
-            angle = angle_left if side == "LEFT" else angle_right
-            angle_text = f"{int(angle)}°"
-            angle_pos = elbow_pos
-            text_size_angle, _ = cv2.getTextSize(angle_text, font, 0.65, 2)
-            
-            badge_x = angle_pos[0] - text_size_angle[0] // 2 - 8
-            badge_y = angle_pos[1] - text_size_angle[1] - 25
-            badge_w = text_size_angle[0] + 16
-            badge_h = text_size_angle[1] + 12
-            
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (badge_x, badge_y), 
-                         (badge_x + badge_w, badge_y + badge_h), (20, 20, 20), -1)
-            cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
-            cv2.rectangle(frame, (badge_x, badge_y), 
-                         (badge_x + badge_w, badge_y + badge_h), arm_line_color, 2)
-            cv2.putText(frame, angle_text, (badge_x + 8, badge_y + text_size_angle[1] + 6), 
-                       font, 0.65, (255, 255, 255), 2)
+    arms = [(side, [points[key] for key in keys]) for side, keys in _ARM_KEYS.items()
+            if all(key in points for key in keys)]
+    if arms:
+        # Linhas com efeito glow: uma chamada de polylines para os dois braços
+        arm_lines = [np.array(arm, dtype=np.int32) for _, arm in arms]
+        cv2.polylines(frame, arm_lines, False, ARM_GLOW_COLOR, arm_line_thickness + 2)
+        cv2.polylines(frame, arm_lines, False, arm_line_color, arm_line_thickness)
+    
+    for side, (shoulder_pos, elbow_pos, wrist_pos) in arms:
+        # Pontos nas articulações (sprites pré-renderizados)
+        _draw_joint(frame, shoulder_pos, JOINT_WHITE_RING)
+        _draw_joint(frame, elbow_pos, JOINT_ARM_RING)
+        _draw_joint(frame, wrist_pos, JOINT_WHITE_RING)
+        
+        # Badge do ângulo
+        angle = angle_left if side == "LEFT" else angle_right
+        angle_text, text_size_angle = ANGLE_LABELS[min(max(int(angle), 0), 180)]
+        angle_pos = elbow_pos
+        
+        badge_x = angle_pos[0] - text_size_angle[0] // 2 - 8
+        badge_y = angle_pos[1] - text_size_angle[1] - 25
+        badge_w = text_size_angle[0] + 16
+        badge_h = text_size_angle[1] + 12
+        
+        # Fundo semitransparente misturado só na região do badge
+        blend_rect(frame, (badge_x, badge_y), (badge_x + badge_w, badge_y + badge_h), (20, 20, 20), 0.85)
+        cv2.rectangle(frame, (badge_x, badge_y), 
+                     (badge_x + badge_w, badge_y + badge_h), arm_line_color, 2)
+        cv2.putText(frame, angle_text, (badge_x + 8, badge_y + text_size_angle[1] + 6), 
+                   SMALL_TEXT_FONT, ANGLE_FONT_SCALE, (255, 255, 255), 2, cv2.LINE_8)
 
     # Desenha pernas se necessário
-    leg_line_color = (255, 100, 0)
+    leg_line_color = LEG_LINE_COLOR
     if pose_mode in ['side_chest', 'most_muscular']:
-        for side in ["LEFT", "RIGHT"]:
-            if (f"{side}_HIP" in points and f"{side}_KNEE" in points and 
-                f"{side}_ANKLE" in points):
-                hip_pos = points[f"{side}_HIP"]
-                knee_pos = points[f"{side}_KNEE"]
-                ankle_pos = points[f"{side}_ANKLE"]
-                
-                glow_color_leg = (leg_line_color[0]//3, leg_line_color[1]//3, leg_line_color[2]//3)
-                cv2.line(frame, hip_pos, knee_pos, glow_color_leg, arm_line_thickness + 2)
-                cv2.line(frame, hip_pos, knee_pos, leg_line_color, arm_line_thickness)
-                cv2.line(frame, knee_pos, ankle_pos, glow_color_leg, arm_line_thickness + 2)
-                cv2.line(frame, knee_pos, ankle_pos, leg_line_color, arm_line_thickness)
-                
-                cv2.circle(frame, hip_pos, joint_radius, (255, 255, 255), -1)
-                cv2.circle(frame, knee_pos, joint_radius, leg_line_color, -1)
-                cv2.circle(frame, ankle_pos, joint_radius, (255, 255, 255), -1)
+        legs = [[points[key] for key in keys] for keys in _LEG_KEYS.values()
+                if all(key in points for key in keys)]
+        if legs:
+            # Mesmo esquema dos braços: glow e linha principal em uma chamada cada
+            leg_lines = [np.array(leg, dtype=np.int32) for leg in legs]
+            cv2.polylines(frame, leg_lines, False, LEG_GLOW_COLOR, arm_line_thickness + 2)
+            cv2.polylines(frame, leg_lines, False, leg_line_color, arm_line_thickness)
+        
+        for hip_pos, knee_pos, ankle_pos in legs:
+            cv2.circle(frame, hip_pos, JOINT_RADIUS, (255, 255, 255), -1)
+            cv2.circle(frame, knee_pos, JOINT_RADIUS, leg_line_color, -1)
+            cv2.circle(frame, ankle_pos, JOINT_RADIUS, (255, 255, 255), -1)
 